@@ -1,9 +1,29 @@
+import os
+import threading
+from collections import deque
+
 import pandas as pd
-from difflib import get_close_matches
+
+from mega_pdp_index import FuzzyMatcher
+from tfidf_index import N_FEATURES, TfidfIndex, char_ngram_terms, sparse
+from workbook_snapshot import manifest_is_current, read_manifest, source_manifest, write_manifest
+
+REPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Google_Analytics", "Analytics_report.xlsx")
 
 HIGH_THRESHOLD = 100_000
 MEDIUM_THRESHOLD = 10_000
 
+# Minimum SequenceMatcher ratio for the fuzzy fallback (same cutoff as difflib.get_close_matches used)
+FUZZY_CUTOFF = 0.6
+
+# Keyword recommendations per headline and the minimum cosine similarity of their character n-grams
+KEYWORD_TOP_K = int(os.getenv("TAGLINE_KEYWORD_TOP_K", "5"))
+KEYWORD_MIN_SCORE = float(os.getenv("TAGLINE_KEYWORD_MIN_SCORE", "0.2"))
+
+# Character n-gram size and vectorizer version; changing either rebuilds the persisted matrix
+KEYWORD_NGRAM = 4
+KEYWORD_VECTORIZER_VERSION = 1
+
 def categorize_search_volume(volume: int) -> str:
     if volume >= HIGH_THRESHOLD:
         return 'High'
@@ -12,19 +32,277 @@ def categorize_search_volume(volume: int) -> str:
     else:
         return 'Low'
 
+class SubstringAutomaton:
+    """
+    Aho–Corasick automaton over a list of patterns: one pass over a text reports
+    every pattern that occurs in it as a substring, including overlapping ones.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                if ch not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][ch] = len(self._goto) - 1
+                state = self._goto[state][ch]
+            self._output[state].append(pattern_id)
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text):
+        """Return the set of pattern ids occurring in text."""
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            found.update(self._output[state])
+        return found
+
+class KeywordIndex:
+    """
+    In-memory index over the Google Analytics keyword report.
+
+    The report is read once and reloaded only when its file modification time
+    changes. Substring hits come from an Aho–Corasick automaton over all keywords
+    and are ranked by longest keyword, then highest search volume; headlines
+    without a substring hit fall back to a character n-gram fuzzy matcher.
+    """
+
+    def __init__(self, path=REPORT_PATH):
+        self.path = path
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    def _refresh(self):
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            df_keywords = pd.read_excel(self.path)
+            self._keywords = df_keywords['Keyword'].astype(str).tolist()
+            self._keywords_lower = [k.lower() for k in self._keywords]
+            self._competition = df_keywords['Competition'].tolist()
+            self._searches = [int(v) for v in df_keywords['Avg. monthly searches']]
+            self._automaton = SubstringAutomaton(self._keywords_lower)
+            self._fuzzy = FuzzyMatcher(self._keywords_lower, query_first=False)
+            # First row of each lowercased keyword, for mapping fuzzy results back
+            self._positions = {}
+            for idx, keyword in enumerate(self._keywords_lower):
+                self._positions.setdefault(keyword, idx)
+            self._mtime = mtime
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def _result(self, idx):
+        avg_search = self._searches[idx]
+        return {
+            'Keyword': self._keywords[idx],
+            'Competition': self._competition[idx],
+            'Avg. monthly searches': avg_search,
+            'Search Category': categorize_search_volume(avg_search)
+        }
+
+    def _match(self, headline):
+        if not isinstance(headline, str) or not headline.strip():
+            return {}
+        headline_lower = headline.strip().lower()
+
+        # 1. Keywords appearing within the headline text: longest, then most searched
+        hits = self._automaton.find_all(headline_lower)
+        if hits:
+            best = min(hits, key=lambda idx: (-len(self._keywords_lower[idx]), -self._searches[idx], idx))
+            return self._result(best)
+
+        # 2. If no substring match, use fuzzy matching
+        close = self._fuzzy.top_k(headline_lower, 1, min_score=FUZZY_CUTOFF)
+        if close:
+            return self._result(self._positions[close[0][0]])
+
+        # No match found
+        return None
+
+    def match(self, headline):
+        """Return the best keyword for one headline (see match_headline_to_keyword)."""
+        self._refresh()
+        return self._match(headline)
+
+    def match_many(self, headlines):
+        """Return one match per headline, in order, checking the report file once."""
+        self._refresh()
+        resolved = {}
+        results = []
+        for headline in headlines:
+            key = headline if isinstance(headline, str) else None
+            if key not in resolved:
+                resolved[key] = self._match(headline)
+            results.append(resolved[key])
+        return results
+
+def keyword_terms(text, n_features=N_FEATURES):
+    return char_ngram_terms(text, n_features, KEYWORD_NGRAM)
+
+class KeywordRecommender:
+    """
+    Top-k keyword recommendations from the Google Analytics report.
+
+    Every report keyword is a row of a character n-gram TF-IDF matrix, which is
+    persisted next to the report (Analytics_report.keywords.npz plus a .json
+    manifest holding the keyword rows) and rebuilt only when the report
+    changes. Headlines are vectorized the same way and a whole batch is scored
+    with sparse matrix products against all keywords, so near spellings and
+    word-order variants ("coach tote bag" / "tote bag coach") rank alongside
+    substring hits.
+    """
+
+    def __init__(self, path=REPORT_PATH):
+        self.path = path
+        self.stem = f"{os.path.splitext(path)[0]}.keywords"
+        self._mtime_ns = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    def _refresh(self):
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            self._index, self._keywords = self._load()
+            self._mtime_ns = mtime_ns
+
+    def _load(self):
+        """Load the persisted matrix, building it first when it is missing or the report changed."""
+        manifest_path = self.stem + ".json"
+        manifest = read_manifest(manifest_path)
+        settings = {"n_features": N_FEATURES, "ngram": KEYWORD_NGRAM, "version": KEYWORD_VECTORIZER_VERSION}
+        if manifest is not None and manifest.get("settings") == settings and os.path.exists(self.stem + ".npz"):
+            if manifest_is_current(manifest_path, manifest, self.path):
+                index = TfidfIndex.load(self.stem + ".npz", keyword_terms)
+                return index, manifest["keywords"]
+
+        df_keywords = pd.read_excel(self.path)
+        keywords = [
+            {'Keyword': keyword, 'Competition': competition, 'Avg. monthly searches': int(searches)}
+            for keyword, competition, searches in zip(
+                df_keywords['Keyword'].astype(str), df_keywords['Competition'], df_keywords['Avg. monthly searches']
+            )
+        ]
+        index = TfidfIndex.build([row['Keyword'] for row in keywords], keyword_terms)
+        index.save(self.stem + ".npz")
+        manifest = source_manifest(self.path)
+        manifest["settings"] = settings
+        manifest["keywords"] = keywords
+        write_manifest(manifest_path, manifest)
+        return index, keywords
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def _result(self, idx, score):
+        row = self._keywords[idx]
+        return {
+            'Keyword': row['Keyword'],
+            'Score': round(score, 3),
+            'Competition': row['Competition'],
+            'Avg. monthly searches': row['Avg. monthly searches'],
+            'Search Category': categorize_search_volume(row['Avg. monthly searches'])
+        }
+
+    def top_k_many(self, headlines, k=KEYWORD_TOP_K, min_score=KEYWORD_MIN_SCORE):
+        """
+        Return, per headline, up to k keyword dicts (as match_headline_to_keyword,
+        plus 'Score', the cosine similarity) with Score > min_score, best first.
+        Headlines that are not text get [].
+        """
+        self._refresh()
+        texts = [headline.strip() for headline in headlines if isinstance(headline, str) and headline.strip()]
+        unique = list(dict.fromkeys(texts))
+        ranked = dict(zip(unique, self._index.top_k_many(unique, k, min_score)))
+        return [
+            [self._result(idx, score) for idx, score in ranked[headline.strip()]]
+            if isinstance(headline, str) and headline.strip() else []
+            for headline in headlines
+        ]
+
+    def top_k(self, headline, k=KEYWORD_TOP_K, min_score=KEYWORD_MIN_SCORE):
+        return self.top_k_many([headline], k, min_score)[0]
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+def get_keyword_index():
+    """Return the shared KeywordIndex over REPORT_PATH, loading it on first use."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = KeywordIndex()
+    return _default_index
+
+_default_recommender = None
+_default_recommender_lock = threading.Lock()
+
+def get_keyword_recommender():
+    """Return the shared KeywordRecommender over REPORT_PATH, or None without scipy."""
+    global _default_recommender
+    if sparse is None:
+        return None
+    with _default_recommender_lock:
+        if _default_recommender is None:
+            _default_recommender = KeywordRecommender()
+    return _default_recommender
+
+def recommend_keywords_many(headlines, k=KEYWORD_TOP_K):
+    """
+    Return the top-k report keywords of each headline (see recommend_keywords).
+    Without scipy, each list holds the single match_headline_to_keyword result.
+    """
+    recommender = get_keyword_recommender()
+    if recommender is not None:
+        return recommender.top_k_many(headlines, k)
+    return [[match] if match else [] for match in get_keyword_index().match_many(headlines)]
+
+def recommend_keywords(headline: str, k: int = KEYWORD_TOP_K) -> list:
+    """
+    Given a product headline, return up to k keywords of the Google Analytics
+    report whose character 4-grams are most similar to it (TF-IDF cosine
+    similarity above KEYWORD_MIN_SCORE), best first, as dicts like
+    match_headline_to_keyword's plus 'Score': the similarity, from 0 to 1.
+    """
+    return recommend_keywords_many([headline], k)[0]
+
 def match_headline_to_keyword(headline: str) -> dict:
     """
-    Given a product headline, find the best-matching keyword in df_keywords,
-    then return its Competition and a High/Medium/Low bucket for avg monthly searches.
+    Given a product headline, find the best-matching keyword in the Google Analytics
+    report, then return its Competition and a High/Medium/Low bucket for avg monthly searches.
 
     Strategy:
       1. Lowercase everything for comparison.
-      2. Check for any exact substring match: if a keyword string appears within the headline.
-      3. If no substring match, fall back to a fuzzy match (difflib.get_close_matches).
+      2. Find every keyword that appears within the headline; prefer the longest,
+         then the one with the most monthly searches.
+      3. If no substring match, fall back to a fuzzy match (SequenceMatcher ratio >= 0.6).
     
     Args:
         headline (str): The product headline (e.g., "Leather Coach Bags for Sale").
-        df_keywords (pd.DataFrame): DataFrame containing the keyword dataset.
     
     Returns:
         dict: {
@@ -35,45 +313,7 @@ def match_headline_to_keyword(headline: str) -> dict:
         }
         or None if no match is found.
     """
-    df_keywords = pd.read_excel("Google_Analytics/Analytics_report.xlsx")
-    if not isinstance(headline, str) or not headline.strip():
-        return {}
-    headline_lower = headline.strip().lower()
-    keywords_list = df_keywords['Keyword'].astype(str).tolist()
-    keywords_lower = [k.lower() for k in keywords_list]
-
-    # 1. Try substring match: look for any keyword that appears in the headline text
-    for idx, kw_lower in enumerate(keywords_lower):
-        if kw_lower in headline_lower:
-            matched_keyword = keywords_list[idx]
-            row = df_keywords.iloc[idx]
-            avg_search = int(row['Avg. monthly searches'])
-            return {
-                'Keyword': matched_keyword,
-                'Competition': row['Competition'],
-                'Avg. monthly searches': avg_search,
-                'Search Category': categorize_search_volume(avg_search)
-            }
-
-    # 2. If no substring match, use fuzzy matching with difflib
-    #    Lowercase keywords passed into get_close_matches
-    match = get_close_matches(headline_lower, keywords_lower, n=1, cutoff=0.6)
-    if match:
-        matched_lower = match[0]
-        # Find the index of the original keyword
-        idx = keywords_lower.index(matched_lower)
-        matched_keyword = keywords_list[idx]
-        row = df_keywords.iloc[idx]
-        avg_search = int(row['Avg. monthly searches'])
-        return {
-            'Keyword': matched_keyword,
-            'Competition': row['Competition'],
-            'Avg. monthly searches': avg_search,
-            'Search Category': categorize_search_volume(avg_search)
-        }
-
-    # No match found
-    return None
+    return get_keyword_index().match(headline)
 
 # -------------------------------------------------------------------
 # Example usage
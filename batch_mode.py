@@ -0,0 +1,329 @@
+"""
+Offline Batch API mode for whole-sheet runs.
+
+Every image-description and tagline request of the use-case sheets is rendered
+into a Batch API input file instead of being sent one by one. Each custom_id is
+the request's cache key, so the same request always gets the same id and
+identical requests are only submitted once. Ingesting a results file stores
+every response in the image / tagline response caches. `collect` then runs the
+normal pipeline in cache-only mode, producing the same rows, journal and
+workbooks as an interactive run without any live calls.
+
+Tagline prompts include the image description, so a run takes two rounds:
+
+    python batch_mode.py render images batches/images.jsonl
+    python batch_mode.py submit batches/images.jsonl            (prints the batch id)
+    python batch_mode.py download <batch id> batches/images_results.jsonl
+    python batch_mode.py ingest batches/images_results.jsonl
+
+    python batch_mode.py render taglines batches/taglines.jsonl
+    ... submit / download / ingest as above ...
+
+    python batch_mode.py collect
+
+To try the flow without the API, `simulate` answers an input file with canned
+responses in the Batch API output format. Canned results must not reach the
+response caches or the journal of live runs (a later run would replay them),
+so the whole dry run uses --scratch, which keeps its caches, journal and
+workbooks under its own directory; `ingest` refuses simulated results without it:
+
+    python batch_mode.py --scratch batches/dry_run render images batches/images.jsonl
+    python batch_mode.py simulate batches/images.jsonl batches/images_results.jsonl
+    python batch_mode.py --scratch batches/dry_run ingest batches/images_results.jsonl
+    ... render / simulate / ingest taglines the same way ...
+    python batch_mode.py --scratch batches/dry_run collect
+"""
+import argparse
+import json
+import os
+
+import image_details_extractor
+from image_details_extractor import build_image_request
+from response_cache import ResponseCache, request_key
+import use_case_1
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch API limit on requests per input file
+BATCH_MAX_REQUESTS = 50000
+
+IMAGE_PREFIX = "image-"
+TAGLINE_PREFIX = "tagline-"
+
+# Result ids of simulate()'s canned responses (the Batch API's start with "batch_req_")
+SIMULATED_PREFIX = "batch_req_local_"
+
+CANNED_RESPONSES = {
+    "image": {
+        "Product name": "Canned product",
+        "Aesthetic style, unique elements": "Canned aesthetic",
+        "Color palette and design motifs": "Canned palette",
+        "Possible brand heritage or historical influences": "Canned heritage",
+    },
+    "tagline": {
+        "editorial_tagline": "Canned tagline.",
+        "SEO Keyword 1": ["canned primary"],
+        "SEO Keyword 2": ["canned secondary"],
+        "SEO Keyword 3": ["canned tertiary"],
+    },
+}
+
+
+def use_scratch(directory):
+    """
+    Point the response caches, the run journal and the result workbooks at
+    directory, so a dry run with canned responses leaves those of live runs alone.
+    """
+    os.makedirs(directory, exist_ok=True)
+    image_details_extractor.image_cache = ResponseCache(os.path.join(directory, "image_descriptions.sqlite3"))
+    use_case_1.tagline_cache = ResponseCache(os.path.join(directory, "tagline_responses.sqlite3"))
+    use_case_1.JOURNAL_PATH = os.path.join(directory, "run_journal.jsonl")
+    use_case_1.RESULTS_DIR = directory
+    use_case_1.BRAND_RESULTS_DIR = os.path.join(directory, "results")
+
+
+def _caches():
+    image_cache = image_details_extractor.image_cache
+    tagline_cache = use_case_1.tagline_cache
+    if image_cache is None or tagline_cache is None:
+        raise SystemExit("Batch mode stores results in the response caches; unset IMAGE_CACHE_DISABLED / TAGLINE_CACHE_DISABLED")
+    return image_cache, tagline_cache
+
+
+def pending_rows(journal, sheet=None):
+    """Yield (brand, sheet name, sheet DataFrame, rows) for the rows not yet in the journal."""
+    for usecase_df, brand, sheet_name in use_case_1.get_usecases():
+        if sheet is not None and sheet_name != sheet:
+            continue
+        data = usecase_df.to_dict(orient='records')
+        version = use_case_1.brands[brand].input_version
+        pending = [pos for pos, item in enumerate(data) if not journal.is_done(brand, sheet_name, item["Item#"], version)]
+        yield brand, sheet_name, usecase_df.iloc[pending], [data[pos] for pos in pending]
+
+
+def image_requests(journal, sheet=None):
+    """Yield (custom_id, request) for every image description that is not cached yet."""
+    image_cache, _ = _caches()
+    for brand, sheet_name, usecase_df, data in pending_rows(journal, sheet):
+        for item in data:
+            images = use_case_1.item_images(item)
+            if not images:
+                continue
+            cache_key, request = build_image_request(images)
+            if image_cache.get(cache_key) is None:
+                yield IMAGE_PREFIX + cache_key, request
+
+
+def tagline_requests(journal, sheet=None):
+    """
+    Yield (custom_id, request) for every tagline that is not cached yet. Rows
+    whose image description has not been ingested yet are skipped and counted.
+    """
+    image_cache, tagline_cache = _caches()
+    waiting = 0
+    for brand, sheet_name, usecase_df, data in pending_rows(journal, sheet):
+        mega_matches, analytics_matches = use_case_1.match_rows(usecase_df, data, brand)
+        for item, mega_match, analytics in zip(data, mega_matches, analytics_matches):
+            product_description_image = {}
+            images = use_case_1.item_images(item)
+            if images:
+                product_description_image = image_cache.get(build_image_request(images)[0])
+                if product_description_image is None:
+                    waiting += 1
+                    continue
+            request, _ = use_case_1.build_tagline_request(item, product_description_image, analytics, brand, mega_match)
+            cache_key = request_key(request)
+            if tagline_cache.get(cache_key) is None:
+                yield TAGLINE_PREFIX + cache_key, request
+    if waiting:
+        print(f"⚠️ {waiting} rows skipped: their image descriptions have not been ingested yet")
+
+
+def render(kind, output_path, sheet=None):
+    """Write the Batch API input file for one kind of request ("images" or "taglines")."""
+    journal = use_case_1.RunJournal(use_case_1.JOURNAL_PATH)
+    requests = image_requests(journal, sheet) if kind == "images" else tagline_requests(journal, sheet)
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    seen = set()
+    with open(output_path, "w", encoding="utf-8") as batch_file:
+        for custom_id, request in requests:
+            if custom_id in seen:
+                continue
+            seen.add(custom_id)
+            line = {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": request}
+            batch_file.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    print(f"Wrote {len(seen)} {kind} requests to {output_path}")
+    if len(seen) > BATCH_MAX_REQUESTS:
+        print(f"⚠️ The Batch API accepts at most {BATCH_MAX_REQUESTS} requests per file; split {output_path} before submitting")
+    return len(seen)
+
+
+def submit(input_path):
+    """Upload an input file and start a batch; returns the batch id."""
+    client = use_case_1.client
+    with open(input_path, "rb") as batch_file:
+        uploaded = client.files.create(file=batch_file, purpose="batch")
+    batch = client.batches.create(input_file_id=uploaded.id, endpoint=BATCH_ENDPOINT, completion_window="24h")
+    print(f"Submitted {input_path} as batch {batch.id} ({batch.status})")
+    return batch.id
+
+
+def download(batch_id, output_path):
+    """Save the output file of a finished batch; returns False while it is still running."""
+    client = use_case_1.client
+    batch = client.batches.retrieve(batch_id)
+    if batch.status != "completed":
+        print(f"Batch {batch_id} is {batch.status}")
+        return False
+    client.files.content(batch.output_file_id).write_to_file(output_path)
+    if batch.error_file_id:
+        error_path = os.path.splitext(output_path)[0] + "_errors.jsonl"
+        client.files.content(batch.error_file_id).write_to_file(error_path)
+        print(f"Some requests failed, see {error_path}")
+    print(f"Saved results of batch {batch_id} to {output_path}")
+    return True
+
+
+def ingest(results_path, allow_simulated=False):
+    """
+    Store every successful response of a Batch API output file in the matching
+    response cache. Canned results from simulate() are refused unless
+    allow_simulated (a --scratch run), so they never reach the caches of live runs.
+    """
+    image_cache, tagline_cache = _caches()
+    stored = {"image": 0, "tagline": 0}
+    failed = 0
+    prompt_tokens = cached_tokens = 0
+
+    with open(results_path, encoding="utf-8") as results_file:
+        for line in results_file:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            if str(result.get("id", "")).startswith(SIMULATED_PREFIX) and not allow_simulated:
+                raise SystemExit(f"{results_path} holds simulated responses; ingest it with --scratch DIR "
+                                 "so they stay out of the response caches of live runs")
+            custom_id = result["custom_id"]
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                failed += 1
+                print(f"⚠️ {custom_id} failed: {result.get('error') or response.get('body')}")
+                continue
+
+            body = response["body"]
+            content = body["choices"][0]["message"]["content"]
+            usage = body.get("usage") or {}
+            prompt_tokens += usage.get("prompt_tokens", 0)
+            cached_tokens += (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+
+            if custom_id.startswith(IMAGE_PREFIX):
+                image_cache.set(custom_id[len(IMAGE_PREFIX):], json.loads(content))
+                stored["image"] += 1
+            elif custom_id.startswith(TAGLINE_PREFIX):
+                # Malformed taglines are not stored, so the next render requests them again
+                try:
+                    use_case_1.parse_tagline(content)
+                except (ValueError, KeyError) as e:
+                    failed += 1
+                    print(f"⚠️ {custom_id} returned an unusable tagline: {e!r}")
+                    continue
+                tagline_cache.set(custom_id[len(TAGLINE_PREFIX):], content)
+                stored["tagline"] += 1
+            else:
+                failed += 1
+                print(f"⚠️ Unknown custom_id {custom_id}")
+
+    print(f"Ingested {stored['image']} image descriptions and {stored['tagline']} taglines "
+          f"({failed} failed; {prompt_tokens} prompt tokens, {cached_tokens} cached)")
+    return stored, failed
+
+
+def simulate(input_path, output_path, canned=CANNED_RESPONSES):
+    """Answer every request of an input file with a canned response, in the Batch API output format."""
+    with open(input_path, encoding="utf-8") as batch_file, open(output_path, "w", encoding="utf-8") as results_file:
+        for number, line in enumerate(batch_file, start=1):
+            request = json.loads(line)
+            kind = "image" if request["custom_id"].startswith(IMAGE_PREFIX) else "tagline"
+            body = {
+                "id": f"chatcmpl-local-{number}",
+                "object": "chat.completion",
+                "model": request["body"]["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(canned[kind], ensure_ascii=False)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+            result = {
+                "id": f"{SIMULATED_PREFIX}{number}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": f"local-{number}", "body": body},
+                "error": None,
+            }
+            results_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(f"Wrote canned results for {input_path} to {output_path}")
+
+
+def collect():
+    """Run the pipeline from the ingested responses only; a missing response raises CacheMiss."""
+    image_cache, tagline_cache = _caches()
+    image_cache.cache_only = True
+    tagline_cache.cache_only = True
+    use_case_1.main()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render, submit and ingest Batch API runs of the use-case sheets.")
+    parser.add_argument("--scratch", help="keep the response caches, journal and workbooks of a dry run under this directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = commands.add_parser("render", help="write a Batch API input file")
+    render_parser.add_argument("kind", choices=["images", "taglines"])
+    render_parser.add_argument("output")
+    render_parser.add_argument("--sheet", help="only render this use-case sheet")
+
+    submit_parser = commands.add_parser("submit", help="upload an input file and start a batch")
+    submit_parser.add_argument("input")
+
+    download_parser = commands.add_parser("download", help="save the output file of a finished batch")
+    download_parser.add_argument("batch_id")
+    download_parser.add_argument("output")
+
+    ingest_parser = commands.add_parser("ingest", help="store a Batch API output file in the response caches")
+    ingest_parser.add_argument("results")
+
+    simulate_parser = commands.add_parser("simulate", help="answer an input file with canned responses")
+    simulate_parser.add_argument("input")
+    simulate_parser.add_argument("output")
+    simulate_parser.add_argument("--canned", help="JSON file with {\"image\": {...}, \"tagline\": {...}} responses")
+
+    commands.add_parser("collect", help="run the pipeline from the ingested responses")
+
+    args = parser.parse_args()
+    if args.scratch:
+        use_scratch(args.scratch)
+    if args.command == "render":
+        render(args.kind, args.output, args.sheet)
+    elif args.command == "submit":
+        submit(args.input)
+    elif args.command == "download":
+        download(args.batch_id, args.output)
+    elif args.command == "ingest":
+        ingest(args.results, allow_simulated=bool(args.scratch))
+    elif args.command == "simulate":
+        canned = CANNED_RESPONSES
+        if args.canned:
+            with open(args.canned, encoding="utf-8") as canned_file:
+                canned = json.load(canned_file)
+        simulate(args.input, args.output, canned)
+    else:
+        collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark the compiled blacklist matcher against the per-keyword re.sub loop
+on the "Full Catalog Short Descriptions" sheet of both POC workbooks.
+
+Run from the repository root:
+    python benchmarks/blacklist_benchmark.py
+"""
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blacklist_matcher import BlacklistMatcher
+from brand_blacklists import COACH_BLACKLISTED_KEYWORDS, SPADE_BLACKLISTED_KEYWORDS
+
+WORKBOOKS = {
+    "Coach": ("Documents/POC Product Selection- Coach Outlet.xlsx", COACH_BLACKLISTED_KEYWORDS),
+    "Spade": ("Documents/POC Product Selection- Kate Spade.xlsx", SPADE_BLACKLISTED_KEYWORDS),
+}
+REPEATS = 5
+
+
+def legacy_remove_blacklisted_keywords(paragraphs, blacklisted_keywords):
+    """The original one-re.sub-per-keyword implementation from get_tagline."""
+    cleaned_paragraphs = []
+
+    for paragraph in paragraphs:
+        if not isinstance(paragraph, str) or not paragraph.strip():
+            continue
+
+        cleaned_paragraph = paragraph
+        for keyword in blacklisted_keywords:
+            pattern = r'\b' + re.escape(keyword) + r'\b'
+            cleaned_paragraph = re.sub(pattern, '', cleaned_paragraph, flags=re.IGNORECASE)
+
+        cleaned_paragraph = ' '.join(cleaned_paragraph.split())
+        cleaned_paragraphs.append(cleaned_paragraph)
+
+    seen = set()
+    return [p for p in cleaned_paragraphs if not (p.lower() in seen or seen.add(p.lower()))]
+
+
+def legacy_find(text, blacklisted_keywords):
+    """The original post-generation violation check from get_tagline."""
+    return [
+        keyword for keyword in blacklisted_keywords
+        if re.search(r'\b' + re.escape(keyword) + r'\b', text, re.IGNORECASE)
+    ]
+
+
+def best_of(func, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    for brand, (path, keywords) in WORKBOOKS.items():
+        descriptions = pd.read_excel(path, sheet_name="Full Catalog Short Descriptions")["Short Description - en"].tolist()
+        texts = [d for d in descriptions if isinstance(d, str)]
+
+        build_time, matcher = best_of(lambda: BlacklistMatcher(keywords))
+
+        legacy_scrub_time, legacy_cleaned = best_of(lambda: legacy_remove_blacklisted_keywords(descriptions, keywords))
+        scrub_time, cleaned = best_of(lambda: matcher.clean(descriptions))
+        assert cleaned == legacy_cleaned, f"{brand}: scrubbed output differs from the legacy implementation"
+
+        legacy_find_time, legacy_found = best_of(lambda: [legacy_find(t, keywords) for t in texts])
+        find_time, found = best_of(lambda: [matcher.find(t) for t in texts])
+        assert found == legacy_found, f"{brand}: violations differ from the legacy implementation"
+
+        print(f"{brand}: {len(descriptions)} descriptions, {len(keywords)} keywords (matcher built in {build_time * 1000:.1f} ms)")
+        print(f"  scrub : legacy {legacy_scrub_time * 1000:8.1f} ms | compiled {scrub_time * 1000:8.1f} ms | {legacy_scrub_time / scrub_time:5.1f}x")
+        print(f"  check : legacy {legacy_find_time * 1000:8.1f} ms | compiled {find_time * 1000:8.1f} ms | {legacy_find_time / find_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark per-call brand setup with the brand registry against rebuilding the
+brand artifacts on every call, as the per-brand branches of get_tagline did
+(blacklist matcher, rule validator, prompt prefix, samples version and the
+catalog's Mega PDP value set).
+
+The registry is loaded from brands.json plus extra copies of the Coach entry,
+so at least --brands brands are configured; calls cycle through all of them.
+
+Run from the repository root:
+    python benchmarks/brand_setup_benchmark.py
+    python benchmarks/brand_setup_benchmark.py --brands 5 --calls 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blacklist_matcher import BlacklistMatcher
+from brand_registry import BRANDS_CONFIG, BrandRegistry
+from mega_pdp_index import CATALOG_SHEETS
+from prompt_layout import PromptLayout
+from sample_cache import content_version
+from tagline_validator import TaglineValidator
+
+REBUILD_CALLS = 20
+
+
+def registry_setup(brand):
+    """Everything a tagline call needs from its brand, from the precompiled registry entry."""
+    return brand.blacklist, brand.validator, brand.prompt.prefix, brand.samples_version, brand.budget, brand.index
+
+
+def rebuilt_setup(brand):
+    """The same artifacts rebuilt from the brand's configuration on every call."""
+    blacklist = BlacklistMatcher(list(brand.blacklisted_keywords))
+    validator = TaglineValidator(blacklist)
+    prefix = PromptLayout(brand.rules, list(brand.blacklisted_keywords)).prefix
+    samples_version = content_version(brand.rules, brand.blacklisted_keywords)
+    mega_values = {
+        value
+        for sheet_name in CATALOG_SHEETS
+        for value in brand.sheets[sheet_name]["Mega PDP Group Value"].str.lower()
+    }
+    return blacklist, validator, prefix, samples_version, mega_values
+
+
+def per_call(setup, brands, calls):
+    start = time.perf_counter()
+    for call in range(calls):
+        setup(brands[call % len(brands)])
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--brands", type=int, default=3, help="minimum number of configured brands")
+    parser.add_argument("--calls", type=int, default=2000, help="calls timed with the registry")
+    args = parser.parse_args()
+
+    with open(BRANDS_CONFIG, encoding="utf-8") as config_file:
+        config = json.load(config_file)
+    for copy in range(1, max(0, args.brands - len(config)) + 1):
+        config[f"Coach copy {copy}"] = dict(config["Coach"], usecase_sheets=[])
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        json.dump(config, config_file)
+    try:
+        start = time.perf_counter()
+        registry = BrandRegistry.from_config(config_file.name).compile()
+        compile_seconds = time.perf_counter() - start
+    finally:
+        os.remove(config_file.name)
+
+    brands = list(registry.values())
+    registry_seconds = per_call(registry_setup, brands, args.calls)
+    rebuilt_seconds = per_call(rebuilt_setup, brands, REBUILD_CALLS)
+
+    print(f"{len(brands)} brands: {', '.join(registry)}")
+    print(f"registry load + compile (once)   : {compile_seconds * 1000:10.1f} ms")
+    print(f"per-call setup, rebuilt per call : {rebuilt_seconds * 1e6:10.1f} us")
+    print(f"per-call setup, registry lookup  : {registry_seconds * 1e6:10.3f} us")
+    print(f"speed-up: {rebuilt_seconds / registry_seconds:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
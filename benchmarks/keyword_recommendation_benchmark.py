@@ -0,0 +1,105 @@
+"""
+Benchmark top-k keyword recommendations against a large analytics report.
+
+The report's keywords are extended up to --keywords rows with synthetic
+variants: a report keyword with one word replaced by a word of the brands' Mega
+PDP group values, so keyword lengths and the share of keywords containing the
+brand name stay those of the real report. They are indexed with the same
+character n-gram TF-IDF vectorizer as KeywordRecommender. Headlines are the
+product names of every configured use-case sheet, repeated up to --headlines,
+and are scored once as a whole batch and once one headline per call.
+
+Run from the repository root:
+    python benchmarks/keyword_recommendation_benchmark.py
+    python benchmarks/keyword_recommendation_benchmark.py --keywords 200000 --headlines 5000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from analytics_matcher import KEYWORD_MIN_SCORE, KEYWORD_TOP_K, REPORT_PATH, keyword_terms
+from brand_registry import BrandRegistry
+from mega_pdp_index import CATALOG_SHEETS
+from tfidf_index import TfidfIndex
+
+SINGLE_CALLS = 200
+
+
+def catalog_words(brands):
+    return sorted({
+        word
+        for brand in brands
+        for sheet_name in CATALOG_SHEETS
+        for value in brand.sheets[sheet_name]["Mega PDP Group Value"].dropna()
+        for word in re.findall(r"[a-z0-9]+", str(value).lower())
+    })
+
+
+def synthetic_keywords(keywords, words, count, seed=1):
+    """The report keywords followed by variants with one word replaced, count in total."""
+    rng = random.Random(seed)
+    result = list(keywords)
+    while len(result) < count:
+        variant = rng.choice(keywords).split()
+        variant[rng.randrange(len(variant))] = rng.choice(words)
+        result.append(" ".join(variant))
+    return result[:count]
+
+
+def headlines(brands, count):
+    names = []
+    for brand in brands:
+        for sheet_name in brand.usecase_sheets:
+            names.extend(name for name in brand.sheets[sheet_name]["Web Product Name - en"] if isinstance(name, str))
+    return (names * (count // len(names) + 1))[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", type=int, default=100_000, help="keywords in the synthetic report")
+    parser.add_argument("--headlines", type=int, default=2000, help="headlines scored in one batch")
+    parser.add_argument("--k", type=int, default=KEYWORD_TOP_K)
+    args = parser.parse_args()
+
+    brands = list(BrandRegistry.from_config().values())
+    report_keywords = pd.read_excel(REPORT_PATH)["Keyword"].astype(str).tolist()
+    keywords = synthetic_keywords(report_keywords, catalog_words(brands), args.keywords)
+    queries = headlines(brands, args.headlines)
+
+    start = time.perf_counter()
+    index = TfidfIndex.build(keywords, keyword_terms)
+    build_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "keywords.npz")
+        index.save(path)
+        start = time.perf_counter()
+        index = TfidfIndex.load(path, keyword_terms)
+        load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.top_k_many(queries, args.k, KEYWORD_MIN_SCORE)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries[:SINGLE_CALLS]:
+        index.top_k_many([query], args.k, KEYWORD_MIN_SCORE)
+    single_seconds = (time.perf_counter() - start) / min(SINGLE_CALLS, len(queries))
+
+    print(f"{len(keywords):,} keywords, {index.matrix.nnz:,} non-zero n-gram weights")
+    print(f"index build (once)            : {build_seconds * 1000:10.1f} ms")
+    print(f"persisted index load          : {load_seconds * 1000:10.1f} ms")
+    print(f"per headline, batch of {len(queries):<6} : {batch_seconds / len(queries) * 1e6:10.1f} us")
+    print(f"per headline, one per call    : {single_seconds * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
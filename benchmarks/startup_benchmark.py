@@ -0,0 +1,76 @@
+"""
+Benchmark start-up of the tagline pipeline: loading both rules documents and POC
+workbooks and building the Mega PDP indexes, eagerly from the source files
+versus through workbook_snapshot (cold = building the snapshot, warm = reusing it).
+
+Each variant runs in a fresh interpreter so import time and peak RSS are comparable.
+
+Run from the repository root:
+    python benchmarks/startup_benchmark.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 3
+
+COMMON = """
+import json, resource, time
+start = time.perf_counter()
+import pandas as pd
+from mega_pdp_index import MegaPDPIndex
+RULES = ["Documents/Coach Rules.docx", "Documents/Kate Spade Rules.docx"]
+WORKBOOKS = ["Documents/POC Product Selection- Coach Outlet.xlsx", "Documents/POC Product Selection- Kate Spade.xlsx"]
+CATALOG_COLUMNS = {
+    "Model Training": ["Mega PDP Group Value", "Short Description - en"],
+    "Full Catalog Short Descriptions": ["Mega PDP Group Value", "Short Description - en"],
+}
+"""
+
+EAGER = COMMON + """
+from docx import Document
+rules = ["\\n".join(para.text for para in Document(path).paragraphs) for path in RULES]
+sheets = [pd.read_excel(path, sheet_name=None) for path in WORKBOOKS]
+indexes = [MegaPDPIndex(brand_sheets) for brand_sheets in sheets]
+"""
+
+SNAPSHOT = COMMON + """
+from workbook_snapshot import WorkbookSnapshot, load_docx_text
+rules = [load_docx_text(path) for path in RULES]
+sheets = [WorkbookSnapshot(path, columns=CATALOG_COLUMNS) for path in WORKBOOKS]
+indexes = [MegaPDPIndex(brand_sheets) for brand_sheets in sheets]
+"""
+
+REPORT = """
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def run(code, env):
+    output = subprocess.run(
+        [sys.executable, "-c", code + REPORT], cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        env = dict(os.environ, WORKBOOK_SNAPSHOT_DIR=snapshot_dir)
+
+        eager = min((run(EAGER, env) for _ in range(REPEATS)), key=lambda r: r["seconds"])
+        cold = run(SNAPSHOT, env)
+        warm = min((run(SNAPSHOT, env) for _ in range(REPEATS)), key=lambda r: r["seconds"])
+
+    for name, result in (("eager (read_excel + docx)", eager), ("snapshot, cold", cold), ("snapshot, warm", warm)):
+        print(f"{name:26s}: {result['seconds'] * 1000:8.1f} ms | peak RSS {result['max_rss_mb']:7.1f} MB")
+    print(f"warm start-up speed-up: {eager['seconds'] / warm['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+End-to-end throughput benchmark of process_usecase against the local
+OpenAI-compatible stub (stub_openai_server.py), without API credits or network.
+
+Synthetic sheets of the requested sizes are built by cycling the rows of the
+Coach use-case sheets (unique Item# and image URL per row). Each size runs in a
+fresh interpreter, in a scratch directory with the response caches disabled,
+and reports items per second, p50/p95 per-item latency and peak RSS.
+
+Run from the repository root:
+    python benchmarks/throughput_benchmark.py
+    python benchmarks/throughput_benchmark.py --sizes 100,1000,10000,100000 --workers 32 --latency lognormal:0.4,0.5
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import contextlib, json, os, re, resource, sys, time
+sys.path.insert(0, {root!r})
+size, workers, pack_size, output_path = {size}, {workers}, {pack_size}, {output_path!r}
+
+with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    import pandas as pd
+    import use_case_1
+    from run_journal import RunJournal
+
+    source = pd.concat([usecase_df for usecase_df, brand, _ in use_case_1.get_usecases() if brand == "Coach"], ignore_index=True)
+    synthetic = source.iloc[[pos % len(source) for pos in range(size)]].reset_index(drop=True)
+    synthetic["Item#"] = [f"SYN{{pos:06d}}" for pos in range(size)]
+    synthetic["Primary Digital Asset URL"] = [
+        ",".join(
+            part + ("&" if "?" in part else "?") + f"synthetic={{pos}}"
+            for part in map(str.strip, re.split(r"[`,]", url)) if part
+        ) if isinstance(url, str) else url
+        for pos, url in enumerate(synthetic["Primary Digital Asset URL"])
+    ]
+
+    latencies = []
+    process_pack = use_case_1.process_pack
+
+    def timed_process_pack(items, *args):
+        start = time.perf_counter()
+        result = process_pack(items, *args)
+        latencies.extend([time.perf_counter() - start] * len(items))
+        return result
+
+    use_case_1.process_pack = timed_process_pack
+    journal = RunJournal("journal.jsonl")
+    start = time.perf_counter()
+    use_case_1.process_usecase(
+        synthetic, "Coach", max_workers=workers, sheet_name="synthetic", journal=journal,
+        return_rows=False, pack_size=pack_size,
+    )
+    seconds = time.perf_counter() - start
+
+latencies.sort()
+usage = use_case_1.tagline_usage.summary()
+with open(output_path, "w") as output_file:
+    json.dump({{
+        "size": size,
+        "seconds": seconds,
+        "items_per_second": size / seconds,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "requests": usage["requests"],
+        "cached_share": usage["cached_share"],
+    }}, output_file)
+"""
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Stub server did not start on port {port}")
+
+
+def run_size(size, args, base_url, scratch):
+    workdir = os.path.join(scratch, f"run_{size}")
+    os.makedirs(workdir)
+
+    output_path = os.path.join(workdir, "result.json")
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=base_url,
+        OPENAI_API_KEY="stub",
+        TAGLINE_CACHE_DISABLED="1",
+        IMAGE_CACHE_DISABLED="1",
+        WORKBOOK_SNAPSHOT_DIR=os.path.join(scratch, "snapshots"),
+    )
+    code = CHILD.format(root=ROOT, size=size, workers=args.workers, pack_size=args.pack_size, output_path=output_path)
+    subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, check=True)
+    with open(output_path) as result_file:
+        return json.load(result_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated synthetic sheet sizes")
+    parser.add_argument("--workers", type=int, default=16, help="process_usecase max_workers")
+    parser.add_argument("--pack-size", type=int, default=1, help="process_usecase pack_size")
+    parser.add_argument("--latency", default="lognormal:0.05,0.5", help="stub latency distribution (see stub_openai_server)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, os.path.join(ROOT, "stub_openai_server.py"), "--port", str(port),
+            "--latency", args.latency, "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        base_url = f"http://127.0.0.1:{port}/v1"
+        print(f"stub latency {args.latency}, errors {args.error_rate:.1%}, 429s {args.rate_limit_rate:.1%}, "
+              f"{args.workers} workers, pack size {args.pack_size}")
+        print(f"{'rows':>8} | {'items/s':>8} | {'p50 s':>7} | {'p95 s':>7} | {'peak RSS MB':>11} | {'requests':>8} | cached")
+        with tempfile.TemporaryDirectory() as scratch:
+            for size in [int(size) for size in args.sizes.split(",")]:
+                result = run_size(size, args, base_url, scratch)
+                print(f"{result['size']:>8} | {result['items_per_second']:>8.1f} | {result['p50']:>7.3f} | {result['p95']:>7.3f} | "
+                      f"{result['max_rss_mb']:>11.1f} | {result['requests']:>8} | {result['cached_share']:.0%}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import re
+
+
+def _trie_pattern(keywords):
+    """
+    Build a regex alternation shaped like a trie of the given keywords, so each
+    text position is tested against one branch per character instead of every
+    keyword. Optional suffixes are greedy, so the longest keyword wins.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node):
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class BlacklistMatcher:
+    """
+    Compiled multi-keyword matcher for a brand's blacklist.
+
+    Behaves exactly like running one r'\\b<keyword>\\b' (case-insensitive) pattern
+    per keyword in list order, but finds every keyword present in a text with a
+    single alternation regex scan, so texts without blacklisted words cost one
+    pass and the per-keyword patterns only run for keywords that actually occur.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._patterns = [re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE) for keyword in self.keywords]
+
+        # lowercased keyword -> positions in the keyword list (the lists contain duplicates)
+        self._positions = {}
+        for pos, keyword in enumerate(self.keywords):
+            self._positions.setdefault(keyword.lower(), []).append(pos)
+
+        # One trie-shaped alternation over every keyword, without word boundaries:
+        # a scan hit is the longest keyword starting at that position
+        unique_keywords = sorted(self._positions)
+        self._scan = re.compile(_trie_pattern(unique_keywords), re.IGNORECASE)
+
+        # Every keyword that matches at a position is a prefix of the longest one matching there
+        self._prefixes = {
+            keyword: [other for other in unique_keywords if keyword.startswith(other)]
+            for keyword in unique_keywords
+        }
+
+    def _find_positions(self, text):
+        """Return the sorted keyword-list positions whose bounded pattern matches somewhere in text."""
+        found = set()
+        start = 0
+        while True:
+            m = self._scan.search(text, start)
+            if m is None:
+                break
+            prefixes = self._prefixes.get(m.group().lower())
+            if prefixes is None:
+                # Case-insensitive hit whose lowercase form is not a keyword (unusual Unicode)
+                return [pos for pos, pattern in enumerate(self._patterns) if pattern.search(text)]
+            for keyword in prefixes:
+                positions = self._positions[keyword]
+                if positions[0] in found:
+                    continue
+                if self._patterns[positions[0]].match(text, m.start()):
+                    found.update(positions)
+            start = m.start() + 1
+        return sorted(found)
+
+    def find(self, text):
+        """
+        Return the blacklisted keywords present in text, in blacklist order
+        (duplicated keywords are reported once per list entry).
+        """
+        return [self.keywords[pos] for pos in self._find_positions(text)]
+
+    def scrub(self, text):
+        """Remove every blacklisted keyword from text, as the per-keyword re.sub loop does."""
+        pending = self._find_positions(text)
+        while pending:
+            pos = pending.pop(0)
+            cleaned = self._patterns[pos].sub('', text)
+            if cleaned != text:
+                text = cleaned
+                # Removing a keyword can create or remove later matches
+                pending = [later for later in self._find_positions(text) if later > pos]
+        return text
+
+    def clean(self, paragraphs):
+        """
+        Scrub blacklisted keywords from sample descriptions, collapse whitespace
+        and drop empty, non-string and case-insensitive duplicate entries.
+        """
+        cleaned_paragraphs = []
+
+        for paragraph in paragraphs:
+            if not isinstance(paragraph, str) or not paragraph.strip():
+                continue  # Skip NaN, empty strings, or non-string values
+
+            cleaned_paragraph = ' '.join(self.scrub(paragraph).split())
+            cleaned_paragraphs.append(cleaned_paragraph)
+
+        # Remove duplicates while preserving order
+        seen = set()
+        unique_paragraphs = [p for p in cleaned_paragraphs if not (p.lower() in seen or seen.add(p.lower()))]
+
+        return unique_paragraphs
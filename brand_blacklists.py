@@ -0,0 +1,75 @@
+# Blacklisted keywords per brand: stripped from sample descriptions and checked in generated taglines
+
+SPADE_BLACKLISTED_KEYWORDS = [
+    "earned a treat", "NO.really", "s.a.l.e.", "expires", "celebrating", "psst",
+    "customer", "hello", "sale on sale", "leaving soon", "Rewarding", "surprise",
+    "elevate", "girl on the go", "hang", "you've bagged", "it's your final chance",
+    "treating you to code", "e_legance", "elegant", "hot", "vintage", "discount",
+    "attention", "you have", "glamorous", "kitsch", "lady", "splurge", "Official",
+    "we're releasing", "discover", "ob_sessed", "got to", "major bag alert", "Officially",
+    "releasing", "open immediately", "retro", "Win", "edgy", "all for you",
+    "you're getting", "order today", "utterly", "#win", "open asap", "now trending",
+    "confirm", "Announcement", "chic", "deal", "1-day", "yes", "all caps",
+    "Announcing", "officially in stock", "adorable", "(1-day special!)", "take",
+    "Lucky you", "Score", "cute", "fresh", "released", "explore", "presenting",
+    "all eyes on", "classy", "gorgeous", "markdown", "Checkout", "no joke",
+    "for you", "awesome", "hung", "Babe", "redeem", "Oooh", "get one",
+    "is sure to excite", "smile", "snack", "hey", "reserved", "make one yours",
+    "nice", "Knott", "as a thank you", "calling your name", "P_ssst", "Psst",
+    "view", "tons", "oh", "no", "earn", "just in", "flirty", "secure",
+    "hello gorgeous", "oof", "glow on", "just reduced", "sexy", "Deserve",
+    "hello", "gorgeous", "sale just dropped", "buy more", "save more", "unlock",
+    "name a more iconic", "Shop", "kind of time-sensitive", "we're confirming",
+    "offering", "treat", "duo", "Styles made to last", "must-have", "alert",
+    "compliments of us", "claim", "New you", "Enhance", "special message",
+    "you're receiving", "upgraded", "we're giving you", "One-day", "No exclusions",
+    "special feature", "just-reduced", "shipment", "hi there", "Snag", "Expires",
+    "girl", "sale confirmed", "wristlet", "Hey you", "Continue", "Leaving soon",
+    "because you rock", "you've secured", "all emojis", "Landed", "check out",
+    "It's your final chance", "the modern woman", "fashion-forward individual", "smart",
+    "PVC", "sophisticated", "modern wardrobe", "luxurious", "logo",
+    "logo embellishment", "Saffiano PVC", "the modern woman", "smart",
+    "sophisticated", "fashion-forward individual", "modern wardrobe", "sophistication",
+    "we", "you", "casual day", "flair", "causal outings", "casual",
+    "brighter days", "metal material", "sophistication", "trust us", "day party",
+    "fashion-savvy individual", "elegance", "elegant", "modern fashion", "modern","precision edge painting"
+]
+
+
+COACH_BLACKLISTED_KEYWORDS = [
+    "inspired by", "chic", "exudes sophistication", "gen-z customer", "gen-z",
+    "aesthetic", "affordable", "ageless", "body", "chic", "coachie", "couture",
+    "craftsman", "customer", "cute", "dainty", "daintier", "darling", "deal",
+    "delightful", "designer", "discount", "disruptive", "don", "donning",
+    "easy win", "elegant", "elegance", "embellished", "enchanting", "engineered",
+    "eternal", "expressive luxury", "fabulous", "fabulousness", "fashion",
+    "fashion lover", "fashionista", "fave", "footwear", "gang", "gender-neutral",
+    "handbag", "hot", "it bag", "it girl", "it’s giving", "jet-set", "lovely",
+    "multifunctional", "must have", "new you", "obsess", "obsessed", "mindful",
+    "green", "conscious", "eco-conscious", "pioneering", "pleasing", "pretty",
+    "purse", "quiet luxury", "sale", "sassy", "savage", "sensations", "sleek",
+    "splendid", "sueded", "sustainable", "szn", "tender", "treasures",
+    "trendsetter", "turn heads", "unearth", "unveil", "unveiling", "uptown style",
+    "downtown style", "urban", "vibes", "but make it fashion", "meet",
+    "experience", "introducing", "just", "literally", "figuratively",
+    "audacious", "pvc", "PVC", "mundane", "nitty-gritties", "beauty scores",
+    "best", "boast", "booster", "statement", "promise", "declaration", "go-to",
+    "taste", "impeccable", "pretty face", "testament", "touches", "must-have",
+    "impraczcal", "unassuming", "overlook", "unusual", "friend", "flair",
+    "fierce", "efforzless", "glamour", "outing", "fashionable", "stylish",
+    "more than a pretty face", "your new best friend", "accessories collection",
+    "boasts", "modern fashion", "this is Coach Outlet's promise to you",
+    "declaration of style", "testament to your impeccable taste",
+    "finishing touches from Coach Outlet", "fashion adventures", "flair",
+    "audacious modern style", "this beauty scores high", "meziculously",
+    "captivating", "aesthetics", "simplicity and class", "dash of the unusual",
+    "crafted to fulfill", "unassuming elegance", "it's impractical to overlook",
+    "sexy", "let's talk about", "inspiration can come", "fall in love",
+    "inspiration can strike", "picture this", "picture themselves", "imagine",
+    "bio-attributed", "bio-based", "biodegradable", "bio-finished",
+    "carbon neutral", "certified b corp", "chemical recycling", "circular",
+    "closed loop", "compostable", "fair trade", "FSC", "forest stewardship",
+    "council", "mechanical recycling", "natural", "PEFC", "recyclable",
+    "upcycled", "SFI", "responsible", "synthetic", "traceable", "transparent",
+    "vegan", "zero waste"
+]
@@ -0,0 +1,168 @@
+"""
+Brand registry loaded from brands.json (or TAGLINE_BRANDS_CONFIG).
+
+Each brand entry names its rules document and POC workbook (paths relative to
+the config file), blacklist (a list of keywords or the name of a list in
+brand_blacklists), Mega PDP matching thresholds, token budget and the use-case
+sheets main() processes:
+
+    "Coach": {
+        "rules": "Documents/Coach Rules.docx",
+        "workbook": "Documents/POC Product Selection- Coach Outlet.xlsx",
+        "blacklist": "COACH_BLACKLISTED_KEYWORDS",
+        "similarity_threshold": 0.7,
+        "fallback_top_k": 10,
+        "token_budget": 4000,
+        "retrieval_top_k": 10,
+        "usecase_sheets": ["1 New Romance Copy Generation", ...]
+    }
+
+retrieval_top_k is how many catalog rows attribute-similarity retrieval (see
+catalog_retrieval) supplies as samples for a product whose Mega PDP group has
+no exact or similar match; 0 keeps the Mega PDP fallback samples.
+
+A brand's per-call artifacts (blacklist matcher, rule validator, prompt prefix,
+token budget and samples version) are compiled when the registry is created;
+the Mega PDP index and the catalog retrieval index are loaded once on first
+use, or up front with compile(). Adding a brand is a new config entry.
+"""
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+import brand_blacklists
+from blacklist_matcher import BlacklistMatcher
+from catalog_retrieval import CatalogRetrieval
+from mega_pdp_index import FALLBACK_TOP_K, SIMILARITY_THRESHOLD, MegaPDPIndex
+from pipeline_timing import span
+from prompt_layout import PromptLayout
+from sample_cache import content_version
+from tagline_validator import TaglineValidator
+from token_budget import DEFAULT_TOKEN_BUDGET, TokenBudget, budget_from_env
+from workbook_snapshot import WorkbookSnapshot, load_docx_text
+
+# Brand settings holding file paths, relative to the config file unless absolute
+CONFIG_PATHS = ("rules", "workbook")
+
+BRANDS_CONFIG = os.getenv("TAGLINE_BRANDS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "brands.json"))
+
+# Catalog sheets only feed MegaPDPIndex, so just its columns are kept
+CATALOG_COLUMNS = {
+    "Model Training": ["Mega PDP Group Value", "Short Description - en"],
+    "Full Catalog Short Descriptions": ["Mega PDP Group Value", "Short Description - en"],
+}
+
+
+def load_blacklist(blacklist):
+    """Keywords of a config blacklist: a list of keywords or the name of a list in brand_blacklists."""
+    if isinstance(blacklist, str):
+        try:
+            return list(getattr(brand_blacklists, blacklist))
+        except AttributeError:
+            raise ValueError(f"Unknown blacklist {blacklist!r}: not defined in brand_blacklists") from None
+    return list(blacklist)
+
+
+class Brand:
+    """One brand's configuration and its compiled artifacts."""
+
+    def __init__(self, name, rules, workbook, blacklist, similarity_threshold=SIMILARITY_THRESHOLD,
+                 fallback_top_k=FALLBACK_TOP_K, token_budget=DEFAULT_TOKEN_BUDGET, retrieval_top_k=FALLBACK_TOP_K,
+                 usecase_sheets=()):
+        self.name = name
+        self.rules_path = rules
+        self.workbook_path = workbook
+        self.similarity_threshold = similarity_threshold
+        self.fallback_top_k = fallback_top_k
+        self.retrieval_top_k = retrieval_top_k
+        self.usecase_sheets = list(usecase_sheets)
+
+        self.rules = load_docx_text(rules)
+        self.blacklisted_keywords = load_blacklist(blacklist)
+        # Sheets are loaded on first access
+        self.sheets = WorkbookSnapshot(workbook, columns=CATALOG_COLUMNS)
+        self.blacklist = BlacklistMatcher(self.blacklisted_keywords)
+        self.validator = TaglineValidator(self.blacklist)
+        self.prompt = PromptLayout(self.rules, self.blacklisted_keywords)
+        self.budget = TokenBudget(budget_from_env(name, token_budget or 0))
+        # Cleaned samples are cached per rules/blacklist version
+        self.samples_version = content_version(self.rules, self.blacklisted_keywords)
+
+        self._index = None
+        self._retrieval = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def input_version(self):
+        """
+        Version of everything the brand's rows are generated from (rules,
+        blacklist and workbook); journaled rows of another version are redone.
+        """
+        return content_version(self.samples_version, self.sheets.sha256)
+
+    @property
+    def index(self):
+        """Mega PDP lookup table, built once the first time it is used."""
+        with self._index_lock:
+            if self._index is None:
+                with span("mega_index_build"):
+                    self._index = MegaPDPIndex(self.sheets, self.similarity_threshold, self.fallback_top_k)
+            return self._index
+
+    @property
+    def retrieval(self):
+        """Catalog retrieval index, or None when retrieval is off for the brand or scipy is missing."""
+        if not self.retrieval_top_k:
+            return None
+        with self._index_lock:
+            if self._retrieval is None:
+                with span("retrieval_index_load"):
+                    self._retrieval = CatalogRetrieval.for_workbook(self.workbook_path) or False
+            return self._retrieval or None
+
+    def compile(self):
+        """Load the Mega PDP and catalog retrieval indexes now instead of on first use."""
+        self.index
+        self.retrieval
+        return self
+
+    def __repr__(self):
+        return f"Brand({self.name!r})"
+
+
+class BrandRegistry(Mapping):
+    """Brands by name, in config order."""
+
+    def __init__(self, brands):
+        self._brands = {brand.name: brand for brand in brands}
+
+    @classmethod
+    def from_config(cls, path=BRANDS_CONFIG):
+        """Load the brands of a config file; relative rules and workbook paths are resolved against its directory."""
+        with open(path, encoding="utf-8") as config_file:
+            config = json.load(config_file)
+        config_dir = os.path.dirname(os.path.abspath(path))
+        for settings in config.values():
+            for key in CONFIG_PATHS:
+                if key in settings:
+                    settings[key] = os.path.join(config_dir, settings[key])
+        return cls(Brand(name, **settings) for name, settings in config.items())
+
+    def __getitem__(self, name):
+        try:
+            return self._brands[name]
+        except KeyError:
+            raise KeyError(f"Unknown brand {name!r}; configured brands: {', '.join(self._brands)}") from None
+
+    def __iter__(self):
+        return iter(self._brands)
+
+    def __len__(self):
+        return len(self._brands)
+
+    def compile(self, names=None):
+        """Load the indexes of the named brands (all by default)."""
+        for name in self if names is None else dict.fromkeys(names):
+            self[name].compile()
+        return self
@@ -0,0 +1,151 @@
+"""
+Attribute-similarity retrieval of few-shot samples from a brand's catalog.
+
+Every catalog row with a short description ("Model Training" and "Full Catalog
+Short Descriptions") is indexed as a hashed TF-IDF vector of the words and word
+pairs of its text columns (product name, Mega PDP group, description and, where
+the sheet has them, the attribute columns). A product is queried with the same
+vectorizer over its own attribute columns, and a whole sheet is answered with
+one sparse matrix product against the catalog.
+
+The index is built offline (`python catalog_retrieval.py build`, or on first use)
+and persisted next to the workbook snapshots as a .npz matrix plus a JSON
+manifest; it is rebuilt only when the workbook changes. Needs scipy; without
+it, CatalogRetrieval.for_workbook() returns None and samples come from the
+Mega PDP match alone.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from mega_pdp_index import CATALOG_SHEETS
+from tfidf_index import N_FEATURES, TfidfIndex, sparse
+from workbook_snapshot import SNAPSHOT_DIR, manifest_is_current, read_manifest, snapshot_stem, source_manifest, write_manifest
+
+RETRIEVAL_DIR = os.getenv("CATALOG_RETRIEVAL_DIR", os.path.join(SNAPSHOT_DIR, "retrieval"))
+
+# Vectorizer version; changing it (or tfidf_index.N_FEATURES) rebuilds the index
+VECTORIZER_VERSION = 1
+
+# Columns that carry no product wording
+SKIPPED_COLUMNS = {"Iteration", "Item#", "Primary Digital Asset URL", "Non-Primary Digital Asset URL"}
+
+DESCRIPTION_COLUMN = "Short Description - en"
+
+
+def row_text(row):
+    """The product wording of a row: its non-empty text columns, in column order."""
+    return " ".join(
+        str(value) for column, value in row.items()
+        if column not in SKIPPED_COLUMNS and isinstance(value, str) and value.strip()
+    )
+
+
+class CatalogRetrieval:
+    """
+    Hashed TF-IDF index of catalog rows. rows holds, per indexed row, its sheet,
+    Item#, Mega PDP group value and short description.
+    """
+
+    def __init__(self, index, rows):
+        self.index = index
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, sheets):
+        """Index the catalog sheets of a {sheet name: DataFrame} mapping."""
+        texts = []
+        rows = []
+        seen = set()
+        for sheet_name in CATALOG_SHEETS:
+            if sheet_name not in sheets:
+                continue
+            for row in sheets[sheet_name].to_dict(orient="records"):
+                description = row.get(DESCRIPTION_COLUMN)
+                if not isinstance(description, str) or not description.strip() or description in seen:
+                    continue
+                seen.add(description)
+                mega_value = row.get("Mega PDP Group Value")
+                texts.append(row_text(row))
+                rows.append({
+                    "sheet": sheet_name,
+                    "Item#": str(row.get("Item#")),
+                    "Mega PDP Group Value": mega_value if isinstance(mega_value, str) else "",
+                    "description": description,
+                })
+        return cls(TfidfIndex.build(texts), rows)
+
+    def vectors(self, texts):
+        return self.index.vectors(texts)
+
+    def top_k_many(self, texts, k=10, min_score=0.0):
+        """
+        Return, for each query text, up to k (row, score) pairs with score > min_score,
+        best first. The whole batch is scored with sparse products against the catalog.
+        """
+        return [
+            [(self.rows[idx], score) for idx, score in matches]
+            for matches in self.index.top_k_many(texts, k, min_score)
+        ]
+
+    def top_k(self, text, k=10, min_score=0.0):
+        return self.top_k_many([text], k, min_score)[0]
+
+    def save(self, stem, manifest):
+        self.index.save(stem + ".npz")
+        manifest["rows"] = self.rows
+        write_manifest(stem + ".json", manifest)
+
+    @classmethod
+    def load(cls, stem, manifest):
+        index = TfidfIndex.load(stem + ".npz")
+        return cls(index, manifest["rows"])
+
+    @classmethod
+    def for_workbook(cls, path, retrieval_dir=RETRIEVAL_DIR):
+        """
+        Load the persisted index of a workbook's catalog sheets, building it first
+        when it is missing or the workbook changed. Returns None without scipy.
+        """
+        if sparse is None:
+            return None
+        stem = snapshot_stem(path, retrieval_dir)
+        manifest = read_manifest(stem + ".json")
+        settings = {"n_features": N_FEATURES, "version": VECTORIZER_VERSION}
+        if manifest is not None and manifest.get("settings") == settings and os.path.exists(stem + ".npz"):
+            if manifest_is_current(stem + ".json", manifest, path):
+                return cls.load(stem, manifest)
+
+        os.makedirs(retrieval_dir, exist_ok=True)
+        with pd.ExcelFile(path) as workbook:
+            index = cls.build({
+                name: workbook.parse(name) for name in CATALOG_SHEETS if name in workbook.sheet_names
+            })
+        manifest = source_manifest(path)
+        manifest["settings"] = settings
+        index.save(stem, manifest)
+        return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build (or refresh) the catalog retrieval index of every configured brand.")
+    parser.add_argument("command", choices=["build"])
+    parser.parse_args()
+
+    from brand_registry import BrandRegistry
+
+    if sparse is None:
+        raise SystemExit("Catalog retrieval needs scipy")
+    for name, brand in BrandRegistry.from_config().items():
+        start = time.perf_counter()
+        index = CatalogRetrieval.for_workbook(brand.workbook_path)
+        print(f"{name}: {len(index)} catalog rows indexed, loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
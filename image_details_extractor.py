@@ -1,39 +1,82 @@
 from openai import OpenAI
 import os
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+import hashlib
 import json
 import base64
+import logging
+import tempfile
 from dotenv import load_dotenv
+from response_cache import CacheMiss, cache_from_env, request_key
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 client = OpenAI(
     api_key=os.getenv("OPENAI_API_KEY"),
 )
 
-def generate_product_description(image_file_paths):
+# On-disk cache of image descriptions (see response_cache.cache_from_env for the IMAGE_CACHE_* settings)
+image_cache = cache_from_env("IMAGE_CACHE", "cache/image_descriptions.sqlite3")
+
+def is_url(image_path):
+    return image_path.startswith("http://") or image_path.startswith("https://")
+
+def normalize_image_paths(image_file_paths):
     """
-    Given a list of image file paths or URLs, send multiple images to Mistral Pixtral-12B
-    for a detailed product description in JSON format.
+    Strip whitespace, lowercase URL scheme and host, and drop duplicates while
+    keeping first-seen order, so the same image is never sent twice.
+    """
+    normalized = []
+    seen = set()
+    for image_path in image_file_paths:
+        image_path = image_path.strip()
+        if not image_path:
+            continue
+        if is_url(image_path.lower()):
+            parts = urlsplit(image_path)
+            image_path = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+        if image_path not in seen:
+            seen.add(image_path)
+            normalized.append(image_path)
+    return normalized
+
+def build_image_request(image_file_paths):
+    """
+    Build the chat completion request describing a list of image file paths or
+    URLs, and its cache key (derived from the de-duplicated URL list, or file
+    contents for local paths). Returns (cache_key, request).
     """
     # Ensure input is a non-empty list
     assert isinstance(image_file_paths, list) and image_file_paths, "Provide a non-empty list of image paths or URLs"
+    image_file_paths = normalize_image_paths(image_file_paths)
+    assert image_file_paths, "Provide a non-empty list of image paths or URLs"
+
+    # Content address of every image: the URL itself, or a hash of the file bytes
+    image_digests = []
+    local_images = {}
+    for image_path in image_file_paths:
+        if is_url(image_path):
+            image_digests.append(image_path)
+        else:
+            image_file = Path(image_path)
+            assert image_file.is_file(), f"Invalid image path: {image_path}"
+            local_images[image_path] = image_file.read_bytes()
+            image_digests.append("sha256:" + hashlib.sha256(local_images[image_path]).hexdigest())
 
     # Build the multimodal message content
     message_content = []
     for idx, image_path in enumerate(image_file_paths, start=1):
         # Detect if the path is a URL (starts with http:// or https://)
-        if image_path.startswith("http://") or image_path.startswith("https://"):
+        if is_url(image_path):
             # Directly append the ImageURLChunk for remote URLs
             message_content.append({"type": "text", "text": f"Image {idx} (URL):"})
             message_content.append({"type": "image_url", "image_url": {"url": image_path}})
         else:
-            # Treat as local file path: validate and Base64-encode
-            image_file = Path(image_path)
-            assert image_file.is_file(), f"Invalid image path: {image_path}"
-
-            # Encode the image to Base64
-            encoded_bytes = base64.b64encode(image_file.read_bytes())
+            # Treat as local file path: Base64-encode the bytes read above
+            encoded_bytes = base64.b64encode(local_images[image_path])
             encoded_str = encoded_bytes.decode()
             base64_data_url = f"data:image/jpeg;base64,{encoded_str}"
 
@@ -56,31 +99,60 @@ def generate_product_description(image_file_paths):
     )
     message_content.append({"type": "text", "text": instruction_text})
 
+    cache_key = request_key({
+        "model": "gpt-4.1",
+        "temperature": 0.2,
+        "images": image_digests,
+        "instructions": instruction_text,
+    })
+    request = dict(
+        model="gpt-4.1",
+        messages=[
+            {
+                "role": "user",
+                "content": message_content
+            }
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.2,
+    )
+    return cache_key, request
+
+def generate_product_description(image_file_paths):
+    """
+    Given a list of image file paths or URLs, send multiple images to Mistral Pixtral-12B
+    for a detailed product description in JSON format.
+
+    Results are cached on disk by the de-duplicated URL list (file contents for
+    local paths), so the same images are only analysed once across runs.
+    """
+    cache_key, request = build_image_request(image_file_paths)
+    if image_cache is not None:
+        cached = image_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        if image_cache.cache_only:
+            raise CacheMiss(f"No cached image description for {image_file_paths[0]} (cache-only mode)")
+
     try:
-        chat_response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {
-                    "role": "user",
-                    "content": message_content
-                }
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2,
-        )
+        chat_response = client.chat.completions.create(**request)
     except Exception as e:
-        print(f"⚠️ Skipped image due to error: {e}")
+        logger.warning(f"⚠️ Skipped image due to error: {e}")
         return {}
 
     # Parse and save the JSON response
     response_dict = json.loads(chat_response.choices[0].message.content)
+    if image_cache is not None:
+        image_cache.set(cache_key, response_dict)
 
-    # Persist the result to a file
+    # Persist the result to a file; written to a temporary file and renamed, so
+    # concurrent threads or processes never interleave their writes
     output_path = Path("image_analysis_output")
     output_path.mkdir(exist_ok=True)
     output_file = output_path / "product_description.json"
-    with open(output_file, "w") as json_file:
+    with tempfile.NamedTemporaryFile("w", dir=output_path, suffix=".tmp", delete=False) as json_file:
         json.dump(response_dict, json_file, indent=4)
+    os.replace(json_file.name, output_file)
 
     return response_dict
 
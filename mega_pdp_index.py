@@ -0,0 +1,280 @@
+import heapq
+import logging
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Catalog sheets searched for sample descriptions, in lookup order
+CATALOG_SHEETS = ("Model Training", "Full Catalog Short Descriptions")
+
+# Minimum similarity for a single "similar" match, and how many values to try below it
+SIMILARITY_THRESHOLD = 0.7
+FALLBACK_TOP_K = 10
+
+
+def similarity(a: str, b: str) -> float:
+    """Return a float [0.0–1.0] for how similar two strings are."""
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def char_ngrams(text, n=3):
+    """Return the set of character n-grams of text, padded with a space on both ends."""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class FuzzyMatcher:
+    """
+    Fuzzy matcher over a fixed list of strings backed by a character n-gram
+    inverted index.
+
+    Candidates are ranked by n-gram overlap (Dice coefficient) and the best
+    `candidate_pool` of them are scored with SequenceMatcher first. Any other
+    value is only scored when its character-count upper bound (the same bound
+    as SequenceMatcher.quick_ratio) could still reach the current top k, so the
+    result is identical to scoring every value.
+
+    Scores are SequenceMatcher(None, query, value).ratio(), or
+    SequenceMatcher(None, value, query).ratio() with query_first=False (the
+    orientation difflib.get_close_matches uses).
+    """
+
+    def __init__(self, values, n=3, candidate_pool=50, query_first=True):
+        self.values = list(values)
+        self.n = n
+        self.candidate_pool = candidate_pool
+        self.query_first = query_first
+        self._gram_counts = []
+        self._postings = {}
+        for idx, value in enumerate(self.values):
+            grams = char_ngrams(value, n)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+        # Per-value character counts for the quick_ratio upper bound
+        self._alphabet = {ch: i for i, ch in enumerate(sorted({ch for value in self.values for ch in value}))}
+        self._char_counts = np.zeros((len(self.values), len(self._alphabet)), dtype=np.int32)
+        for idx, value in enumerate(self.values):
+            for ch, count in Counter(value).items():
+                self._char_counts[idx, self._alphabet[ch]] = count
+        self._lengths = np.array([len(value) for value in self.values], dtype=np.int64)
+
+    def _candidates(self, query):
+        query_grams = char_ngrams(query, self.n)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # Dice coefficient on n-gram sets; ties keep index order
+        ranked = sorted(
+            shared,
+            key=lambda idx: (-2 * shared[idx] / (len(query_grams) + self._gram_counts[idx]), idx),
+        )
+        return ranked[:self.candidate_pool]
+
+    def _upper_bounds(self, query):
+        query_counts = np.zeros(len(self._alphabet), dtype=np.int32)
+        for ch, count in Counter(query).items():
+            if ch in self._alphabet:
+                query_counts[self._alphabet[ch]] = count
+        matches = np.minimum(self._char_counts, query_counts).sum(axis=1)
+        totals = self._lengths + len(query)
+        return np.where(totals > 0, 2.0 * matches / np.maximum(totals, 1), 1.0)
+
+    def _scorer(self, query):
+        if self.query_first:
+            return lambda idx: similarity(query, self.values[idx])
+
+        # The query is the second sequence: analyse it once and reuse it for every value
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+
+        def score(idx):
+            matcher.set_seq1(self.values[idx])
+            return matcher.ratio()
+        return score
+
+    def top_k(self, query, k=10, min_score=0.0):
+        """
+        Return up to k (value, score) pairs with score >= min_score, sorted by
+        SequenceMatcher ratio, highest first. Equal scores keep the order in
+        which values were indexed.
+        """
+        if not self.values or k <= 0:
+            return []
+
+        score_of = self._scorer(query)
+        bounds = self._upper_bounds(query)
+        scores = {idx: score_of(idx) for idx in self._candidates(query) if bounds[idx] >= min_score}
+        heap = heapq.nlargest(k, scores.values())
+        heapq.heapify(heap)
+        threshold = max(heap[0], min_score) if len(heap) == k else min_score
+
+        # Score the rest only while their upper bound can still tie the k-th best
+        remaining = np.flatnonzero(bounds >= threshold)
+        remaining = remaining[np.argsort(-bounds[remaining], kind="stable")]
+        for idx in remaining.tolist():
+            if bounds[idx] < threshold:
+                break
+            if idx in scores:
+                continue
+            score = score_of(idx)
+            scores[idx] = score
+            if len(heap) < k:
+                heapq.heappush(heap, score)
+            elif score > heap[0]:
+                heapq.heapreplace(heap, score)
+            if len(heap) == k:
+                threshold = max(heap[0], min_score)
+
+        scored = sorted((item for item in scores.items() if item[1] >= min_score), key=lambda x: (-x[1], x[0]))
+        return [(self.values[idx], score) for idx, score in scored[:k]]
+
+
+class MegaPDPIndex:
+    """
+    Brand-level lookup table from a normalized (lowercased) "Mega PDP Group Value"
+    to the catalog rows that carry it.
+
+    Built once per brand workbook so that exact lookups and sample fetches in
+    get_tagline are dictionary hits instead of a full DataFrame scan per product.
+    A fuzzy match needs at least similarity_threshold to count as "Similar";
+    below it, the fallback_top_k best values are tried in order.
+    """
+
+    def __init__(self, sheets, similarity_threshold=SIMILARITY_THRESHOLD, fallback_top_k=FALLBACK_TOP_K):
+        self.similarity_threshold = similarity_threshold
+        self.fallback_top_k = fallback_top_k
+        # normalized value -> [(sheet_name, descriptions, original values), ...] in CATALOG_SHEETS order
+        self._groups = {}
+
+        for sheet_name in CATALOG_SHEETS:
+            df = sheets[sheet_name]
+            lowered = df["Mega PDP Group Value"].str.lower()
+            for key, rows in df.groupby(lowered, sort=False):
+                self._groups.setdefault(key, []).append((
+                    sheet_name,
+                    rows["Short Description - en"].tolist(),
+                    rows["Mega PDP Group Value"].tolist(),
+                ))
+
+        # Unique normalized values, in first-seen order
+        self.values = list(self._groups)
+        self.fuzzy = FuzzyMatcher(self.values)
+
+    def __contains__(self, mega_value):
+        return mega_value in self._groups
+
+    def __len__(self):
+        return len(self._groups)
+
+    def fetch(self, mega_value):
+        """
+        Return (descriptions, original values) for every catalog row whose
+        normalized group value equals mega_value, across all catalog sheets.
+        """
+        descriptions = []
+        values = []
+        for _, sheet_descriptions, sheet_values in self._groups.get(mega_value, []):
+            descriptions.extend(sheet_descriptions)
+            values.extend(sheet_values)
+        return descriptions, values
+
+    def fetch_first(self, match_vals):
+        """
+        Return (descriptions, original values) from the first sheet of the first
+        value in match_vals that has catalog rows, or two empty lists if none do.
+        """
+        for match_val in match_vals:
+            entries = self._groups.get(match_val)
+            if entries:
+                _, descriptions, values = entries[0]
+                return list(descriptions), list(values)
+        return [], []
+
+    def match(self, mega_value):
+        """
+        Resolve a normalized group value against the catalog.
+
+        Returns a dict with the match type ("Exact", "Similar threshold greater
+        than 70%", "Less than 70%" (for the default threshold) or "" for an empty catalog), the matched
+        original group values, their raw sample descriptions and the top fuzzy
+        candidates with their scores (empty for exact matches).
+        """
+        result = {
+            "Match_Type": "",
+            "Matched OLD Mega PDP Value": [],
+            "Sample Descriptions": [],
+            "Similar Values": [],
+        }
+
+        # Check for exact match
+        if mega_value in self:
+            logger.debug("Exact match")
+            result["Match_Type"] = "Exact"
+            result["Sample Descriptions"], result["Matched OLD Mega PDP Value"] = self.fetch(mega_value)
+            return result
+
+        # If no exact match, try similar match
+        similarity_scores = self.fuzzy.top_k(mega_value, self.fallback_top_k)
+        if not similarity_scores:
+            return result
+        result["Similar Values"] = similarity_scores
+
+        top_match_val, top_match_score = similarity_scores[0]
+        if top_match_score >= self.similarity_threshold:
+            logger.debug(f"Found similar match: {top_match_val} (Score: {top_match_score})")
+            result["Match_Type"] = f"Similar threshold greater than {self.similarity_threshold:.0%}"
+            match_vals = [top_match_val]
+        else:
+            logger.debug(f"No strong match found, returning top {self.fallback_top_k} matches")
+            result["Match_Type"] = f"Less than {self.similarity_threshold:.0%}"
+            for val, score in similarity_scores:
+                logger.debug(f"Match: {val} (Score: {score})")
+            match_vals = [val for val, _ in similarity_scores]
+
+        # Stop at first valid match
+        result["Sample Descriptions"], result["Matched OLD Mega PDP Value"] = self.fetch_first(match_vals)
+        return result
+
+    def is_weak(self, result):
+        """True when a match() result has neither an exact nor a similar match (the top-k fallback, or nothing)."""
+        if result["Match_Type"] == "Exact":
+            return False
+        similar_values = result["Similar Values"]
+        return not similar_values or similar_values[0][1] < self.similarity_threshold
+
+
+def normalize_mega_value(raw_mega_value):
+    """Lowercase a "Mega PDP Group Value" cell; missing values become an empty string."""
+    return str(raw_mega_value).lower() if pd.notna(raw_mega_value) else ""
+
+
+def match_usecase(usecase_df, index):
+    """
+    Resolve the Mega PDP match for every row of a use-case sheet in one pass.
+
+    Each distinct normalized group value is matched once and the result is
+    broadcast back to its rows, so the table can be built (and inspected) before
+    any LLM call. Returns a DataFrame aligned with usecase_df's index with the
+    "Item#" and "Mega PDP Group Value" columns followed by the match columns.
+    """
+    raw_values = usecase_df.get("Mega PDP Group Value", pd.Series("", index=usecase_df.index))
+    normalized = raw_values.map(normalize_mega_value)
+    resolved = {value: index.match(value) for value in normalized.unique()}
+
+    match_table = pd.DataFrame.from_records(
+        [resolved[value] for value in normalized],
+        index=usecase_df.index,
+    )
+    match_table.insert(0, "Mega PDP Group Value", raw_values)
+    if "Item#" in usecase_df:
+        match_table.insert(0, "Item#", usecase_df["Item#"])
+    return match_table
@@ -0,0 +1,130 @@
+"""
+Near-duplicate pruning of sample descriptions with MinHash and LSH.
+
+Descriptions that differ only by a color name or a word or two (common among
+the catalog rows of one Mega PDP group) add prompt tokens without adding
+examples. Each description is reduced to its set of word shingles and a MinHash
+signature; signatures are split into LSH bands so only descriptions sharing a
+band bucket are compared, and a description is dropped when the exact Jaccard
+similarity of its shingles with an earlier kept description reaches the
+threshold. Work is linear in the number of descriptions (plus the few
+candidates each one collides with).
+"""
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Jaccard similarity of word shingles at which a description counts as a near duplicate; "0" disables pruning
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("TAGLINE_NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# Words per shingle and MinHash permutations
+SHINGLE_SIZE = 2
+NUM_PERM = 64
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = (1 << 61) - 1
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of hashed word shingles of text (lowercased); short texts use their words."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) > size:
+        words = [" ".join(words[start:start + size]) for start in range(len(words) - size + 1)]
+    return {zlib.crc32(word.encode("utf-8")) for word in words}
+
+
+def lsh_bands(threshold, num_perm=NUM_PERM):
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve threshold
+    (1 / bands) ** (1 / rows) is closest to the Jaccard threshold.
+    """
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+def jaccard(first, second):
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class NearDuplicateFilter:
+    """Order-preserving MinHash/LSH filter: keeps the first of every group of near-duplicate texts."""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=NUM_PERM, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_bands(threshold, num_perm) if threshold > 0 else (0, 0)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """MinHash signature (num_perm values) of a set of 32-bit shingle hashes."""
+        values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        # 32-bit values times 61-bit coefficients can overflow uint64; the wrapped
+        # product is still a fixed pseudo-random function of x, which is all MinHash needs
+        hashed = (np.outer(values, self._a) + self._b) % _PRIME
+        return hashed.min(axis=0)
+
+    def prune(self, texts):
+        """Return (kept texts, removed texts), both in input order."""
+        if self.threshold <= 0 or len(texts) < 2:
+            return list(texts), []
+
+        kept = []
+        removed = []
+        kept_shingles = []
+        buckets = {}
+        for text in texts:
+            shingle_set = shingles(text)
+            if not shingle_set:
+                kept.append(text)
+                continue
+            signature = self.signature(shingle_set)
+            keys = [
+                (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)
+            ]
+            candidates = {idx for key in keys for idx in buckets.get(key, ())}
+            if any(jaccard(shingle_set, kept_shingles[idx]) >= self.threshold for idx in sorted(candidates)):
+                removed.append(text)
+                continue
+            for key in keys:
+                buckets.setdefault(key, []).append(len(kept_shingles))
+            kept_shingles.append(shingle_set)
+            kept.append(text)
+        return kept, removed
+
+
+class PruneStats:
+    """Per-run counts of items whose samples lost near duplicates, and the tokens removed."""
+
+    def __init__(self):
+        self.items = 0
+        self.pruned_items = 0
+        self.removed = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, removed, tokens):
+        with self._lock:
+            self.items += 1
+            if removed:
+                self.pruned_items += 1
+                self.removed += removed
+                self.tokens += tokens
+
+    def summary(self):
+        with self._lock:
+            return {
+                "items": self.items,
+                "pruned_items": self.pruned_items,
+                "removed": self.removed,
+                "tokens": self.tokens,
+            }
@@ -0,0 +1,143 @@
+"""
+Run every (brand, use-case sheet) pair of brands.json as an independent job on
+a process pool, then merge the results into the same workbooks as main().
+
+The parent process loads the sheets and builds each brand's Mega PDP index and
+the analytics keyword indexes before the pool starts; with the "fork" start
+method the jobs inherit them copy-on-write and only read them. Every job
+streams its finished rows into the shared run journal (one O_APPEND write per
+row) and shares the SQLite response caches, so an interrupted run resumes like
+a sequential one. Within a job, rows still run on TAGLINE_MAX_WORKERS threads.
+
+    python orchestrator.py                       # one process per job, up to the CPU count
+    python orchestrator.py --processes 4 --sheet "1 New Romance Copy Generation"
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pipeline_timing
+import use_case_1
+from analytics_matcher import get_keyword_index, get_keyword_recommender
+from run_journal import RunJournal
+
+logger = logging.getLogger(__name__)
+
+# Job processes; 0 runs one per job, up to the CPU count
+PROCESSES = int(os.getenv("TAGLINE_PROCESSES", "0"))
+
+
+def _init_worker():
+    # Each process streams its per-item timings to its own file and starts from no
+    # spans, so the parent's (inherited through fork) are not reported twice
+    timing = pipeline_timing.timing
+    if timing.enabled:
+        timing.drain()
+        if timing.items_path:
+            timing.items_path = f"{os.path.splitext(timing.items_path)[0]}.{os.getpid()}.jsonl"
+
+
+def run_job(brand, sheet_name, journal_path, max_workers, pack_size):
+    """
+    Process one use-case sheet in a pool process; returns its progress summary,
+    with the job's stage timings under "timing" when timing is enabled.
+    """
+    usecase_df = use_case_1.brands[brand].sheets[sheet_name]
+    journal = RunJournal(journal_path)
+    version = use_case_1.brands[brand].input_version
+    pending = sum(not journal.is_done(brand, sheet_name, item_no, version) for item_no in usecase_df["Item#"])
+    requests_before = use_case_1.tagline_usage.summary()["requests"]
+
+    start = time.perf_counter()
+    use_case_1.process_usecase(
+        usecase_df, brand, max_workers=max_workers, sheet_name=sheet_name, journal=journal,
+        return_rows=False, pack_size=pack_size,
+    )
+    seconds = time.perf_counter() - start
+    return {
+        "brand": brand,
+        "sheet": sheet_name,
+        "rows": len(usecase_df),
+        "processed": pending,
+        "seconds": seconds,
+        "rows_per_second": pending / seconds if seconds else 0.0,
+        "requests": use_case_1.tagline_usage.summary()["requests"] - requests_before,
+        "pid": os.getpid(),
+        "timing": pipeline_timing.timing.drain() if pipeline_timing.timing.enabled else None,
+    }
+
+
+def run_all(usecases, processes=PROCESSES, journal_path=use_case_1.JOURNAL_PATH,
+            max_workers=use_case_1.MAX_WORKERS, pack_size=use_case_1.PACK_SIZE):
+    """
+    Run the (sheet DataFrame, brand, sheet name) use cases on a process pool and
+    return the summaries of the finished jobs; failed jobs are logged and skipped.
+    """
+    # Shared read-only state, built before the pool so forked jobs inherit it
+    use_case_1.brands.compile(brand for _, brand, _ in usecases)
+    get_keyword_recommender() or get_keyword_index()
+
+    processes = min(processes or os.cpu_count() or 1, len(usecases)) or 1
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    logger.info(f"Running {len(usecases)} jobs on {processes} processes")
+
+    summaries = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(run_job, brand, sheet_name, journal_path, max_workers, pack_size): (brand, sheet_name)
+            for _, brand, sheet_name in usecases
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            brand, sheet_name = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                logger.error(f"[{done}/{len(futures)}] {brand} / {sheet_name} failed: {e!r}")
+                continue
+            timing = summary.pop("timing")
+            if timing is not None:
+                pipeline_timing.timing.merge(*timing)
+            summaries.append(summary)
+            logger.info(
+                f"[{done}/{len(futures)}] {brand} / {sheet_name}: {summary['processed']} of {summary['rows']} rows "
+                f"in {summary['seconds']:.1f}s ({summary['rows_per_second']:.2f} rows/s, "
+                f"{summary['requests']} tagline requests, pid {summary['pid']})"
+            )
+
+    seconds = time.perf_counter() - start
+    processed = sum(summary["processed"] for summary in summaries)
+    logger.info(f"Finished {len(summaries)} of {len(futures)} jobs: {processed} rows in {seconds:.1f}s "
+                f"({processed / seconds if seconds else 0.0:.2f} rows/s)")
+    # One report for the run, from the spans every job sent back
+    if pipeline_timing.timing.enabled:
+        pipeline_timing.write_reports()
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every brand's use-case sheets in parallel processes.")
+    parser.add_argument("--processes", type=int, default=PROCESSES, help="job processes (0: one per job, up to the CPU count)")
+    parser.add_argument("--brand", action="append", help="only run this brand (repeatable)")
+    parser.add_argument("--sheet", action="append", help="only run this sheet (repeatable)")
+    args = parser.parse_args()
+
+    use_case_1.configure_logging()
+    usecases = [
+        (usecase_df, brand, sheet_name)
+        for usecase_df, brand, sheet_name in use_case_1.get_usecases()
+        if (not args.brand or brand in args.brand) and (not args.sheet or sheet_name in args.sheet)
+    ]
+    if not usecases:
+        raise SystemExit("No use-case sheets selected")
+
+    run_all(usecases, args.processes)
+    journal = RunJournal(use_case_1.JOURNAL_PATH)
+    use_case_1.export_run(journal, usecases)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Lightweight stage timing for the tagline pipeline.
+
+    with span("llm_call"):
+        ...
+
+Spans are aggregated per stage (count, total, mean, p50, p95, max) and, inside
+an item() block, attributed to that use-case row; per-item timings are streamed
+to a JSONL file as each item finishes. write_reports() writes the aggregate as
+JSON and as a Prometheus text file.
+
+Timing is off unless enabled with enable() or TAGLINE_TIMING=1; while off,
+span() and item() return a shared no-op context manager, so instrumented code
+pays one function call and one attribute check per span.
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import nullcontext
+
+_NULL_CONTEXT = nullcontext()
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Item:
+    __slots__ = ("recorder", "key", "previous", "start")
+
+    def __init__(self, recorder, key):
+        self.recorder = recorder
+        self.key = key
+
+    def __enter__(self):
+        local = self.recorder._local
+        self.previous = getattr(local, "item", None)
+        local.item = {"item": self.key, "stages": {}}
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        local = self.recorder._local
+        entry = local.item
+        local.item = self.previous
+        entry["seconds"] = time.perf_counter() - self.start
+        self.recorder.finish_item(entry)
+        return False
+
+
+class TimingRecorder:
+    """Per-stage durations of a run, with optional streaming of per-item timings."""
+
+    def __init__(self, enabled=False, items_path=None):
+        self.enabled = enabled
+        self.items_path = items_path
+        self.items = 0
+        self._durations = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._items_file = None
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Span(self, name)
+
+    def item(self, key):
+        """Attribute the spans of the enclosed block (on this thread) to one item."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Item(self, key)
+
+    def record(self, name, seconds):
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = array("d")
+            durations.append(seconds)
+        current = getattr(self._local, "item", None)
+        if current is not None:
+            current["stages"][name] = current["stages"].get(name, 0.0) + seconds
+
+    def finish_item(self, entry):
+        with self._lock:
+            self.items += 1
+            if self.items_path is None:
+                return
+            if self._items_file is None:
+                directory = os.path.dirname(self.items_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._items_file = open(self.items_path, "w", encoding="utf-8")
+            self._items_file.write(json.dumps(entry, default=str) + "\n")
+            self._items_file.flush()
+
+    def drain(self):
+        """
+        Return (items, {stage: durations}) recorded so far and start over; used to
+        ship a worker process's timings to the parent, which merge()s them.
+        """
+        with self._lock:
+            drained = self.items, self._durations
+            self.items = 0
+            self._durations = {}
+        return drained
+
+    def merge(self, items, durations):
+        """Add the items and stage durations drained from another recorder."""
+        with self._lock:
+            self.items += items
+            for name, seconds in durations.items():
+                self._durations.setdefault(name, array("d")).extend(seconds)
+
+    def summary(self):
+        """Aggregate timings per stage, in seconds."""
+        with self._lock:
+            stages = {name: sorted(durations) for name, durations in self._durations.items()}
+        report = {}
+        for name, durations in stages.items():
+            count = len(durations)
+            total = sum(durations)
+            report[name] = {
+                "count": count,
+                "total": total,
+                "mean": total / count,
+                "p50": durations[count // 2],
+                "p95": durations[min(count - 1, int(count * 0.95))],
+                "max": durations[-1],
+            }
+        return report
+
+    def prometheus(self, prefix="tagline_stage"):
+        """Render the aggregate as Prometheus text exposition format (one summary per stage)."""
+        lines = [
+            f"# HELP {prefix}_seconds Time spent in each tagline pipeline stage.",
+            f"# TYPE {prefix}_seconds summary",
+        ]
+        for name, stats in sorted(self.summary().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_seconds{{stage="{label}",quantile="0.5"}} {stats["p50"]:.6f}')
+            lines.append(f'{prefix}_seconds{{stage="{label}",quantile="0.95"}} {stats["p95"]:.6f}')
+            lines.append(f'{prefix}_seconds_sum{{stage="{label}"}} {stats["total"]:.6f}')
+            lines.append(f'{prefix}_seconds_count{{stage="{label}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, json_path, prometheus_path):
+        """Write the aggregate report as JSON and as a Prometheus text file."""
+        for path in (json_path, prometheus_path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            if self._items_file is not None:
+                self._items_file.flush()
+        report = {"items": self.items, "items_path": self.items_path, "stages": self.summary()}
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2)
+        with open(prometheus_path, "w", encoding="utf-8") as prometheus_file:
+            prometheus_file.write(self.prometheus())
+
+
+TIMING_DIR = os.getenv("TAGLINE_TIMING_DIR", "timing")
+
+timing = TimingRecorder(
+    enabled=os.getenv("TAGLINE_TIMING") == "1",
+    items_path=os.path.join(TIMING_DIR, "items.jsonl"),
+)
+
+
+def enable(items_path=None):
+    """Turn timing on for the rest of the run (optionally streaming per-item timings elsewhere)."""
+    if items_path is not None:
+        timing.items_path = items_path
+    timing.enabled = True
+
+
+def span(name):
+    return timing.span(name)
+
+
+def item(key):
+    return timing.item(key)
+
+
+def write_reports(json_path=None, prometheus_path=None):
+    timing.write_reports(
+        json_path or os.path.join(TIMING_DIR, "report.json"),
+        prometheus_path or os.path.join(TIMING_DIR, "report.prom"),
+    )
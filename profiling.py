@@ -0,0 +1,112 @@
+"""
+Profiling helpers for `python use_case_1.py --profile`.
+
+profile_call() runs a function once under cProfile (deterministic) while a
+StackSampler thread samples the calling thread's stack at a fixed interval. It writes the pstats dump (.prof, for snakeviz / pstats) and the
+samples as folded stacks (.folded, for flamegraph.pl, speedscope or inferno).
+print_stage_hotspots() then lists the hottest functions of the match, scrub
+and prompt-build stages from the cProfile stats.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Stage -> pstats restriction (regex on "file:line(function)") selecting its modules
+PROFILE_STAGES = {
+    "match": r"mega_pdp_index|analytics_matcher|catalog_retrieval|tfidf_index|difflib",
+    "scrub": r"blacklist_matcher|sample_cache",
+    "prompt build": r"prompt_layout|token_budget",
+}
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sample the Python stack of one thread (by default the creating one) into folded-stack counts."""
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as folded_file:
+            for stack, count in self.stacks.most_common():
+                folded_file.write(f"{stack} {count}\n")
+
+
+def profile_call(func, output_dir, name, interval=DEFAULT_SAMPLE_INTERVAL):
+    """
+    Run func() under cProfile and a StackSampler, writing <name>.prof and
+    <name>.folded to output_dir. Returns (pstats.Stats, paths, seconds).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    with StackSampler(interval) as sampler:
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            func()
+        finally:
+            profiler.disable()
+        seconds = time.perf_counter() - start
+
+    paths = {
+        "cprofile": os.path.join(output_dir, f"{name}.prof"),
+        "flamegraph": os.path.join(output_dir, f"{name}.folded"),
+    }
+    profiler.dump_stats(paths["cprofile"])
+    sampler.write_folded(paths["flamegraph"])
+    return pstats.Stats(profiler), paths, seconds
+
+
+def stats_table(stats, sort, *restrictions):
+    """pstats table (header row onwards) of stats sorted by sort, filtered by restrictions."""
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(*restrictions)
+    stats.stream = sys.stdout
+    text = stream.getvalue()
+    return text[text.index("   ncalls"):].rstrip() + "\n" if "   ncalls" in text else "(no calls)\n"
+
+
+def print_stage_hotspots(stats, top=10, stages=PROFILE_STAGES):
+    """Print the top functions by own time of each stage, then overall by cumulative time."""
+    for stage, restriction in stages.items():
+        print(f"==== Hot functions: {stage} ====")
+        print(stats_table(stats, "tottime", restriction, top))
+    print("==== Hot functions: overall (cumulative) ====")
+    print(stats_table(stats, "cumulative", top))
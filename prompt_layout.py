@@ -0,0 +1,214 @@
+import json
+import math
+import threading
+
+from token_budget import count_tokens
+
+SYSTEM_PROMPT = "\n".join([
+    "You are a world-class luxury fashion editor. Do NOT add Blacklisted Words in the tagline."
+    "Instructions:",
+    "1. You are given a set of rules. Follow them exactly to generate a new tagline.",
+    "2. Do NOT repeat any word in the tagline.",
+    "3. Do NOT include the phrase “what fits inside.”",
+    "4. Do NOT include any city-specific references.",
+    "5. Do NOT mention pairing dress or attire.",
+    "6. Do NOT use general phrases—be product-specific.",
+    "7. Maintain a natural, authentic tone.",
+    "8. Strictly avoid all blacklisted words (severe penalty for violations).",
+    "9. Strictly follow the structure and the content of sample given, else you will be heavily penalized.",
+    "**You must follow Instructions and rules at any cost, else you will be heavily penalized.**",
+])
+
+# Product attributes that are never sent to the model
+SKIPPED_ATTRIBUTES = ["What Fits Inside - en", "Iteration", "Tech Fit - en", "Primary Digital Asset URL", "Non-Primary Digital Asset URL"]
+
+# Keys every entry of a packed response must carry besides "Item#"
+PACKED_RESULT_KEYS = ["editorial_tagline", "SEO Keyword 1", "SEO Keyword 2", "SEO Keyword 3"]
+
+
+class PromptLayout:
+    """
+    Tagline prompt for one brand, split into a static prefix and a per-product part.
+
+    Everything that only depends on the brand (instructions, rules document,
+    SEO guidance, blacklist and response format) is rendered once into
+    `prefix`, so every request for the brand starts with the same bytes and the
+    provider's prompt cache can reuse it. Samples, analytics, the image
+    description and the product attributes follow after it.
+    """
+
+    def __init__(self, rules, blacklisted_keywords):
+        self.prefix = "\n".join([
+            "Instructions:",
+            "1. You are given a set of rules. Follow them exactly to generate a new tagline.",
+            "2. Do NOT repeat any word in the tagline.",
+            "3. Do NOT include the phrase “what fits inside.”",
+            "4. Do NOT include any city-specific references.",
+            "5. Do NOT mention pairing dress or attire.",
+            "6. Do NOT use general phrases—be product-specific.",
+            "7. Maintain a natural, authentic tone.",
+            "8. Strictly avoid all blacklisted words (severe penalty for violations).",
+            "9. Strictly follow the structure and the content of sample given, else you will be heavily penalized.",
+            "**You must follow Instructions and rules at any cost, else you will be heavily penalized.**",
+            "####",
+            "Rules:",
+            f"{rules}",
+            "####",
+            "SEO Guidance:",
+            "Generate an SEO keyword list.",
+            "Keyword Hierarchy (incorporate these into your tagline where natural):",
+            "- **Primary Keywords** - Describing product type (example - Flap shoulder bag, Colorblocked bag, Convertible bag)",
+            "- **Secondary Keywords** - Describing characteristics (example - Pebbled leather, Colorblocked leather, Classic flap silhouette, Adjustable crossbody strap, Convertible design)",
+            "- **Tertiary Keywords** - Describing function - (example - Optional crossbody strap, Everyday bag, Versatile handbag)",
+            "####",
+            f"Before generating the tagline, Please check: Do NOT use these blacklisted words under any circumstances: {blacklisted_keywords}.",
+            "Do not use you, your,etc in tagline.",
+            "Format your response exactly like this (so it’s easy to parse):",
+            "```json",
+            "{",
+            '  "editorial_tagline": "...",',
+            '  "SEO Keyword 1": ["...", "...", "..."],',
+            '  "SEO Keyword 2": ["...", "...", "..."],',
+            '  "SEO Keyword 3": ["...", "...", "..."]',
+            "}",
+            "```",
+        ])
+        self._prefix_tokens = None
+
+    @property
+    def prefix_tokens(self):
+        if self._prefix_tokens is None:
+            self._prefix_tokens = count_tokens(self.prefix)
+        return self._prefix_tokens
+
+    @staticmethod
+    def samples_section(samples):
+        return "\n".join([
+            "####",
+            "**Strictly follow the structure and the content of sample given below, to generate the new tagline. Keep the structure and content same to the given sample. Do not add Blacklisted words.**",
+            f"{samples}",
+        ])
+
+    def sections(self, product_attributes, samples, analytics, product_description_image):
+        """
+        Render the per-product part of the prompt that follows the static prefix,
+        as {"samples", "analytics", "image", "attributes"} texts ("" when absent).
+        """
+        sections = {"samples": self.samples_section(samples), "analytics": "", "image": ""}
+
+        if analytics:
+            # Recommended keywords, best first, one per line
+            sections["analytics"] = "\n".join([
+                "####",
+                "Analyze the Google Analytics report below:",
+                *(f"{keyword}" for keyword in analytics),
+            ])
+
+        if product_description_image != {}:
+            sections["image"] = "\n".join([
+                "####",
+                " Below is the visual description of the image. Do take into account while framing the Tagline.",
+                f"{product_description_image}",
+            ])
+
+        prompt = ["####", "Below are the attributes for the product:"]
+
+        # Dynamically iterate over every top-level key in the dictionary
+        for key, value in product_attributes.items():
+            if key in SKIPPED_ATTRIBUTES:
+                continue
+            if value == "" or (isinstance(value, float) and math.isnan(value)):
+                continue
+            pretty_value = json.dumps(value, indent=2, ensure_ascii=False)
+            # Prepend each line of the value with two spaces so it's clear it belongs under the key
+            indented_value = "\n".join([f"  {line}" for line in pretty_value.splitlines()])
+            # Append a line like "Key:" followed by the indented JSON value
+            prompt.append(f"- {key}:\n{indented_value}")
+
+        sections["attributes"] = "\n".join(prompt)
+        return sections
+
+    def join(self, sections):
+        """Return the full user prompt: the static prefix followed by the non-empty sections."""
+        return "\n".join([self.prefix] + [text for text in sections.values() if text])
+
+    def render(self, product_attributes, samples, analytics, product_description_image):
+        return self.join(self.sections(product_attributes, samples, analytics, product_description_image))
+
+    def render_packed(self, products):
+        """
+        Render one prompt for several products: the static prefix, then each
+        product's analytics, image description and attributes under its
+        "Item#", and the format of the packed response. A samples section is
+        emitted before the first product and again whenever the samples change,
+        so products of the same group (kept adjacent by the caller) share one.
+        products is a list of
+        (item_no, product_attributes, samples, analytics, product_description_image).
+        """
+        prompt = [self.prefix]
+        last_samples = None
+        for item_no, product_attributes, samples, analytics, product_description_image in products:
+            sections = self.sections(product_attributes, samples, analytics, product_description_image)
+            if samples != last_samples:
+                prompt.append(sections["samples"])
+                last_samples = samples
+            prompt.append(f"==== Product Item# {json.dumps(item_no, ensure_ascii=False)} ====")
+            prompt.extend(text for name, text in sections.items() if name != "samples" and text)
+
+        prompt.extend([
+            "####",
+            f"Generate one tagline for each of the {len(products)} products above, following every instruction and rule for each of them.",
+            "Instead of the single-product format, respond with one entry per product, in the same order, exactly like this:",
+            "```json",
+            "{",
+            '  "items": [',
+            "    {",
+            '      "Item#": <Item# exactly as given above>,',
+            '      "editorial_tagline": "...",',
+            '      "SEO Keyword 1": ["...", "...", "..."],',
+            '      "SEO Keyword 2": ["...", "...", "..."],',
+            '      "SEO Keyword 3": ["...", "...", "..."]',
+            "    }",
+            "  ]",
+            "}",
+            "```",
+        ])
+        return "\n".join(prompt)
+
+
+class UsageTracker:
+    """
+    Running totals of token usage and latency for the completions of a run,
+    including the prompt tokens the provider served from its prompt cache.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, usage, seconds):
+        """Add one response's usage block (may be None) and its wall-clock latency."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        with self._lock:
+            self.requests += 1
+            self.seconds += seconds
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+                self.cached_tokens += getattr(details, "cached_tokens", 0) or 0
+
+    def summary(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "seconds": self.seconds,
+                "cached_share": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+                "avg_latency": self.seconds / self.requests if self.requests else 0.0,
+            }
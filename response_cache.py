@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+
+# SQLite connections must not be used across fork(): a forked process gets a fresh
+# lock and opens its own connection on first use
+_open_caches = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for cache in _open_caches:
+        cache._lock = threading.Lock()
+        cache._connection = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class CacheMiss(KeyError):
+    """Raised in cache-only mode when a request has no cached response."""
+
+
+def request_key(request):
+    """Stable hash of a request dict (model, temperature, messages, response format, ...)."""
+    payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Disk-backed (SQLite) cache of JSON-serializable values keyed by request hash.
+
+    Entries older than `ttl` seconds are ignored and purged; once more than
+    `max_entries` are stored, the least recently used ones are evicted. With
+    `cache_only`, a miss raises CacheMiss instead of letting the caller make the
+    request, so a re-run of unchanged sheets never reaches the API.
+
+    The database is shared between processes: it uses WAL mode, and a process
+    forked from the one that opened the cache reconnects on first use.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=None, cache_only=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_only = cache_only
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = None
+        _open_caches.add(self)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @property
+    def _conn(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        return self._connection
+
+    def get(self, key):
+        """Return the cached value for key, or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def get_or_call(self, request, call, validate=None):
+        """
+        Return the cached value for request, or call() and cache its result.
+        Raises CacheMiss in cache-only mode when nothing is cached.
+
+        validate(value) raises (any exception) for a value that must not be
+        cached: a fresh value that fails is returned to nobody and never stored,
+        so the request is retried on the next run, and a cached value that fails
+        counts as a miss.
+        """
+        key = request_key(request)
+        value = self.get(key)
+        if value is not None:
+            try:
+                if validate is not None:
+                    validate(value)
+                return value
+            except Exception:
+                value = None
+        if self.cache_only:
+            raise CacheMiss(f"No cached response for request {key[:12]} (cache-only mode)")
+        value = call()
+        if validate is not None:
+            validate(value)
+        self.set(key, value)
+        return value
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cache_from_env(prefix, default_path):
+    """
+    Build a ResponseCache configured from environment variables:
+      <prefix>_PATH         database file (default: default_path)
+      <prefix>_TTL_DAYS     expire entries after this many days
+      <prefix>_MAX_ENTRIES  keep at most this many entries
+      <prefix>_ONLY         "1" to fail fast on misses instead of calling the API
+    Returns None when <prefix>_DISABLED is "1".
+    """
+    if os.getenv(f"{prefix}_DISABLED") == "1":
+        return None
+    ttl_days = os.getenv(f"{prefix}_TTL_DAYS")
+    max_entries = os.getenv(f"{prefix}_MAX_ENTRIES")
+    return ResponseCache(
+        os.getenv(f"{prefix}_PATH", default_path),
+        ttl=float(ttl_days) * 86400 if ttl_days else None,
+        max_entries=int(max_entries) if max_entries else None,
+        cache_only=os.getenv(f"{prefix}_ONLY") == "1",
+    )
@@ -0,0 +1,113 @@
+import logging
+import math
+import os
+
+import xlsxwriter
+
+from run_journal import RunJournal
+
+logger = logging.getLogger(__name__)
+
+# Columns of the "new format" workbook
+NEW_FORMAT_COLUMNS = [
+    "Item#",
+    "Web Product Name - en",
+    "Mega PDP Group Value",
+    "editorial_tagline",
+    "SEO Keyword 1",
+    "SEO Keyword 2",
+    "SEO Keyword 3"
+]
+
+
+def _cell_value(value):
+    """Convert a journaled value the way DataFrame.to_excel would write it (None means an empty cell)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (list, dict, tuple)):
+        return str(value)
+    return value
+
+
+class _SheetWriter:
+    """Row-by-row worksheet writer with a pandas-style header, in constant-memory mode."""
+
+    def __init__(self, path, columns):
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_urls': False})
+        self.worksheet = self.workbook.add_worksheet("Sheet1")
+        self.columns = columns
+        self.row = 0
+        header_format = self.workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        for col, name in enumerate(columns):
+            self.worksheet.write_string(0, col, name, header_format)
+
+    def write(self, row):
+        self.row += 1
+        for col, name in enumerate(self.columns):
+            value = _cell_value(row.get(name))
+            if value is not None:
+                self.worksheet.write(self.row, col, value)
+
+    def close(self):
+        self.workbook.close()
+
+
+def export_results(journal, all_results_path="All_Usecases_Results.xlsx",
+                   new_format_path="All_Results_New_Format.xlsx", order=None):
+    """
+    Build both result workbooks from a RunJournal in a single streaming pass.
+
+    `order` is an optional list of (brand, sheet, Item#) keys giving the row order
+    (the use-case sheets' order); by default rows are written in journal order.
+    Only byte offsets and column names are held in memory: rows are read back one
+    at a time and written with xlsxwriter's constant-memory mode.
+    Returns the number of rows written.
+    """
+    if isinstance(journal, (str, os.PathLike)):
+        journal = RunJournal(journal)
+
+    # Index pass: where each row lives in the journal and which column layout it has
+    offsets = {}
+    layouts = {}
+    for offset, entry in journal.entries(with_offsets=True):
+        layout = layouts.setdefault(tuple(entry["row"]), len(layouts))
+        offsets[(entry["brand"], entry["sheet"], str(entry["Item#"]))] = (offset, layout)
+
+    if order is None:
+        keys = list(offsets)
+    else:
+        keys = [(brand, sheet, str(item_no)) for brand, sheet, item_no in order]
+        missing = [key for key in keys if key not in offsets]
+        if missing:
+            logger.warning(f"⚠️ {len(missing)} rows are not in the journal and will be skipped, e.g. {missing[0]}")
+        keys = [key for key in keys if key in offsets]
+
+    # Union of columns in first-seen row order, as pd.concat would produce
+    layout_columns = {layout: names for names, layout in layouts.items()}
+    columns = {}
+    seen_layouts = set()
+    for key in keys:
+        layout = offsets[key][1]
+        if layout not in seen_layouts:
+            seen_layouts.add(layout)
+            columns.update(dict.fromkeys(layout_columns[layout]))
+
+    all_results = _SheetWriter(all_results_path, list(columns))
+    new_format = _SheetWriter(new_format_path, NEW_FORMAT_COLUMNS)
+    try:
+        for key in keys:
+            row = journal.read_entry(offsets[key][0])["row"]
+            all_results.write(row)
+            new_format.write(row)
+    finally:
+        all_results.close()
+        new_format.close()
+
+    logger.info(f"Saved to {all_results_path}")
+    logger.info(f"Saved to {new_format_path}")
+    return len(keys)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("TAGLINE_LOG_LEVEL", "INFO").upper(), format="%(message)s")
+    export_results(os.getenv("TAGLINE_JOURNAL", "checkpoints/run_journal.jsonl"))
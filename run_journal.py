@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+
+class RunJournal:
+    """
+    Append-only JSONL journal of finished use-case rows.
+
+    Every processed row is written (and fsynced) as one line keyed by brand,
+    sheet name and "Item#" as soon as it completes, so a crash only loses the
+    rows that were in flight. On restart the journal is read back and finished
+    rows are skipped. A later entry for the same row (e.g. a regenerated
+    tagline) replaces the earlier one. Delete the file to start a fresh run.
+
+    Entries carry the version of the inputs the row was generated from (see
+    Brand.input_version); a row journaled under another version is not done,
+    so editing the rules, blacklist or workbook regenerates its rows.
+
+    Only the keys of finished rows are kept in memory; rows are streamed back
+    from the file when needed, so memory stays flat as the catalog grows.
+
+    Each entry is written with a single O_APPEND write, so several processes can
+    append to the same journal (one job per sheet) without interleaving lines.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._done = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        for entry in self.entries():
+            self._done[self._key(entry["brand"], entry["sheet"], entry["Item#"])] = entry.get("version")
+
+        # Terminate a partial last line from a crash so new entries start on their own line
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb+") as journal_file:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    journal_file.write(b"\n")
+
+    @staticmethod
+    def _key(brand, sheet, item_no):
+        return brand, sheet, str(item_no)
+
+    def __len__(self):
+        return len(self._done)
+
+    def is_done(self, brand, sheet, item_no, version=None):
+        """Whether the row is journaled (under `version`, when one is given)."""
+        key = self._key(brand, sheet, item_no)
+        return key in self._done and (version is None or self._done[key] == version)
+
+    def entries(self, with_offsets=False):
+        """
+        Yield every journal entry ({"brand", "sheet", "Item#", "row"}) in file order,
+        or (byte offset, entry) pairs with with_offsets=True.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as journal_file:
+            while True:
+                offset = journal_file.tell()
+                line = journal_file.readline()
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial last line from a crash mid-write
+                yield (offset, entry) if with_offsets else entry
+
+    def read_entry(self, offset):
+        """Return the entry stored at a byte offset reported by entries(with_offsets=True)."""
+        with open(self.path, "rb") as journal_file:
+            journal_file.seek(offset)
+            return json.loads(journal_file.readline())
+
+    def rows(self, brand, sheet):
+        """Return {str(Item#): row} for every journaled row of one sheet."""
+        return {
+            str(entry["Item#"]): entry["row"]
+            for entry in self.entries()
+            if entry["brand"] == brand and entry["sheet"] == sheet
+        }
+
+    def append(self, brand, sheet, item_no, row, version=None):
+        entry = {"brand": brand, "sheet": sheet, "Item#": item_no, "row": row, "version": version}
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        data = (line + "\n").encode("utf-8")
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                written = os.write(fd, data)
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._done[self._key(brand, sheet, item_no)] = version
@@ -0,0 +1,239 @@
+"""
+Local OpenAI-compatible stub for benchmarks and offline runs.
+
+Serves POST /v1/chat/completions (JSON mode) with deterministic canned outputs:
+image-description requests get a product-analysis object, tagline requests a
+tagline with SEO keywords, and packed tagline requests one entry per "Item#".
+The same request always gets the same content. Latency is drawn from a
+configurable distribution, and 500 / 429 errors can be injected at a given rate.
+Usage blocks report prompt tokens (four characters per token) and simulate
+provider prompt caching for prefixes seen before.
+
+Point the pipeline at it through the OpenAI client's base URL:
+
+    python stub_openai_server.py --port 8089 --latency lognormal:0.4,0.5 --rate-limit-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub python use_case_1.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TAGLINE_WORDS = [
+    "structured", "pebbled", "leather", "carryall", "polished", "hardware", "zip", "pocket", "strap",
+    "silhouette", "compact", "roomy", "suede", "trim", "crossbody", "tote", "satchel", "grain", "finish",
+    "detachable", "adjustable", "gusset", "lining", "buckle", "flap", "snap", "refined", "sculpted",
+    "smooth", "textured", "curved", "slim", "tailored", "soft", "crisp", "glossy", "matte",
+]
+
+# Providers only cache prompts of at least this many tokens, in steps of PROMPT_CACHE_STEP
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP = 128
+
+PACKED_ITEM_PATTERN = re.compile(r"^==== Product Item# (.*) ====$", re.MULTILINE)
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution in seconds: "fixed:S", "uniform:LOW,HIGH",
+    "normal:MEAN,STDDEV" or "lognormal:MEDIAN,SIGMA". Returns a function of a
+    random.Random instance.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def request_hash(body):
+    payload = json.dumps({"model": body.get("model"), "messages": body.get("messages")}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def message_text(message):
+    content = message.get("content")
+    if isinstance(content, list):
+        return "".join(part.get("text", "") or json.dumps(part) for part in content)
+    return content or ""
+
+
+class StubBehaviour:
+    """Latency, error injection and canned outputs shared by every request of a stub server."""
+
+    def __init__(self, latency="fixed:0", error_rate=0.0, rate_limit_rate=0.0, violation_rate=0.0, seed=0):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.violation_rate = violation_rate
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self._rng = random.Random(seed)
+        self._prefixes = set()
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Return (delay in seconds, status code) for the next request."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency(self._rng)
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                return delay, 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                return delay, 500
+            return delay, 200
+
+    def cached_tokens(self, prompt):
+        """Tokens of the longest previously seen prompt prefix, like provider prompt caching."""
+        chars_per_step = PROMPT_CACHE_STEP * 4
+        steps = len(prompt) // chars_per_step
+        hashes = [hashlib.sha256(prompt[:step * chars_per_step].encode("utf-8")).digest() for step in range(1, steps + 1)]
+        with self._lock:
+            cached_steps = 0
+            for step, digest in enumerate(hashes, start=1):
+                if digest not in self._prefixes:
+                    break
+                cached_steps = step
+            self._prefixes.update(hashes)
+        cached = cached_steps * PROMPT_CACHE_STEP
+        return cached if cached >= PROMPT_CACHE_MIN_TOKENS else 0
+
+    def content(self, body):
+        """Deterministic canned response content for a chat completion request."""
+        digest = request_hash(body)
+        rng = random.Random(digest)
+        last_message = body["messages"][-1]
+
+        if isinstance(last_message.get("content"), list):
+            return json.dumps({
+                "Product name": f"Stub product {digest[:8]}",
+                "Aesthetic style, unique elements": " ".join(rng.sample(TAGLINE_WORDS, 3)),
+                "Color palette and design motifs": " ".join(rng.sample(TAGLINE_WORDS, 2)),
+                "Possible brand heritage or historical influences": "None identifiable",
+            })
+
+        def tagline_entry():
+            tagline = " ".join(rng.sample(TAGLINE_WORDS, 6)).capitalize() + "."
+            if rng.random() < self.violation_rate:
+                tagline += " Made to show off what fits inside."
+            return {
+                "editorial_tagline": tagline,
+                "SEO Keyword 1": rng.sample(TAGLINE_WORDS, 3),
+                "SEO Keyword 2": rng.sample(TAGLINE_WORDS, 3),
+                "SEO Keyword 3": rng.sample(TAGLINE_WORDS, 3),
+            }
+
+        item_numbers = PACKED_ITEM_PATTERN.findall(message_text(body["messages"][1]) if len(body["messages"]) > 1 else "")
+        if item_numbers:
+            return json.dumps({"items": [{"Item#": json.loads(item_no), **tagline_entry()} for item_no in item_numbers]})
+        return json.dumps(tagline_entry())
+
+    def completion(self, body):
+        prompt = "\n".join(message_text(message) for message in body.get("messages", []))
+        content = self.content(body)
+        prompt_tokens = math.ceil(len(prompt) / 4)
+        completion_tokens = math.ceil(len(content) / 4)
+        return {
+            "id": f"chatcmpl-stub-{request_hash(body)[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": self.cached_tokens(prompt)},
+            },
+        }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        behaviour = self.server.behaviour
+        delay, status = behaviour.draw()
+        time.sleep(delay)
+        if status == 429:
+            self.send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}}, {"Retry-After": "0"})
+        elif status != 200:
+            self.send_json(status, {"error": {"message": "Injected server error (stub)", "type": "server_error"}})
+        else:
+            self.send_json(200, behaviour.completion(body))
+
+
+def start_stub_server(host="127.0.0.1", port=0, **behaviour):
+    """
+    Start a stub server on a background thread and return it; its base URL for
+    the OpenAI client is server.base_url. Stop it with server.shutdown().
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.behaviour = StubBehaviour(**behaviour)
+    server.base_url = f"http://{host}:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions stub.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S, uniform:LOW,HIGH, normal:MEAN,SD or lognormal:MEDIAN,SIGMA (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with HTTP 429")
+    parser.add_argument("--violation-rate", type=float, default=0.0, help="share of taglines that break the \"what fits inside\" rule")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    server.behaviour = StubBehaviour(args.latency, args.error_rate, args.rate_limit_rate, args.violation_rate, args.seed)
+    print(f"Stub OpenAI server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
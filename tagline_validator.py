@@ -0,0 +1,132 @@
+import html
+import re
+import threading
+from collections import Counter
+
+# Function words the "do not repeat any word" rule does not apply to
+REPEATABLE_WORDS = {
+    "a", "an", "the", "and", "or", "but", "nor", "so", "yet", "of", "to", "in", "on", "at", "for", "with", "by",
+    "from", "as", "into", "onto", "while", "up", "out", "off", "over", "under", "about", "than", "then", "there",
+    "here", "when", "where", "which", "who", "what", "how", "its", "it", "it's", "is", "are", "be", "was", "were",
+    "has", "have", "had", "do", "does", "can", "will", "this", "that", "these", "those", "you", "your", "our", "we",
+    "they", "them", "their", "all", "any", "each", "every", "both", "more", "most", "other", "some", "such", "no",
+    "not", "only", "own", "same", "too", "very", "just", "also", "one", "two",
+}
+
+# Hyphenated compounds ("zip-top") are one word
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+MARKUP_PATTERN = re.compile(r"<[^>]+>")
+ATTRIBUTE_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+WHAT_FITS_INSIDE_PATTERN = re.compile(r"\bwhat\s+fits\s+inside\b", re.IGNORECASE)
+
+
+def product_words(product_attributes):
+    """Lower-cased words of a product's attribute values (name, materials, pockets, closure, ...)."""
+    words = set()
+    for value in (product_attributes or {}).values():
+        if isinstance(value, str):
+            words.update(ATTRIBUTE_WORD_PATTERN.findall(value.lower()))
+    return words
+
+
+def repeated_words(text, allowed=()):
+    """
+    Content words used more than once within one sentence of text. Function
+    words and the allowed words (the product's own vocabulary, which the
+    brand's approved copy repeats) do not count.
+    """
+    text = MARKUP_PATTERN.sub(" ", html.unescape(text))
+    repeated = {}
+    for sentence in SENTENCE_PATTERN.split(text):
+        words = Counter(word.lower().replace("’", "'") for word in WORD_PATTERN.findall(sentence))
+        for word, count in words.items():
+            if count > 1 and len(word) > 1 and word not in REPEATABLE_WORDS and word not in allowed:
+                repeated[word] = None
+    return list(repeated)
+
+
+class TaglineValidator:
+    """
+    Local checks for the tagline rules that can be verified mechanically:
+    blacklisted words, repeated words and "what fits inside". Rules that need
+    judgement (city references, pairing with attire, product specificity) are
+    left to the model.
+
+    The repeat check is scoped to content words within a sentence, leaving out
+    the product's own vocabulary: the taglines are multi-sentence paragraphs,
+    and the brands' approved catalog copy repeats product names, materials and
+    pocket types across and within sentences. Second-person wording is not
+    checked, since both brands' rules documents ask to address the customer
+    with "you" and "your".
+    """
+
+    def __init__(self, blacklist):
+        self.blacklist = blacklist
+
+    def violations(self, tagline, product_attributes=None):
+        """
+        Return a description of every rule the tagline breaks (empty when it
+        passes); product_attributes are the row's attributes, whose words may repeat.
+        """
+        if not isinstance(tagline, str) or not tagline.strip():
+            return ["empty tagline"]
+
+        found = []
+        blacklisted = self.blacklist.find(tagline)
+        if blacklisted:
+            found.append(f"blacklisted words: {', '.join(dict.fromkeys(blacklisted))}")
+
+        repeated = repeated_words(tagline, product_words(product_attributes))
+        if repeated:
+            found.append(f"repeated words: {', '.join(repeated)}")
+
+        if WHAT_FITS_INSIDE_PATTERN.search(tagline):
+            found.append("contains \"what fits inside\"")
+
+        return found
+
+
+def rule_name(violation):
+    """Rule part of a violation description, used to count violations per rule."""
+    return violation.split(":", 1)[0]
+
+
+class ValidationStats:
+    """Per-run counts of checked taglines, violations per rule and regeneration calls."""
+
+    def __init__(self):
+        self.checked = 0
+        self.violating = 0
+        self.rules = Counter()
+        self.extra_calls = 0
+        self.fixed = 0
+        self.unresolved = 0
+        self._lock = threading.Lock()
+
+    def record_check(self, violations):
+        with self._lock:
+            self.checked += 1
+            if violations:
+                self.violating += 1
+                self.rules.update(rule_name(violation) for violation in violations)
+
+    def record_regeneration(self, attempts, violations):
+        with self._lock:
+            self.extra_calls += attempts
+            if violations:
+                self.unresolved += 1
+            else:
+                self.fixed += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "violating": self.violating,
+                "violation_rate": self.violating / self.checked if self.checked else 0.0,
+                "rules": dict(self.rules),
+                "extra_calls": self.extra_calls,
+                "fixed": self.fixed,
+                "unresolved": self.unresolved,
+            }
@@ -0,0 +1,146 @@
+"""
+Hashed TF-IDF vectors on scipy.sparse, queried by cosine similarity.
+
+Texts are turned into feature ids by a terms function (words and word pairs,
+or character n-grams), hashed with crc32 so the ids are stable across processes
+and runs, weighted by sublinear term frequency times smoothed IDF and L2
+normalized. A batch of queries is scored against every indexed row with one
+sparse matrix product per block, and the top k of each query are selected with
+argpartition among the rows it shares a feature with, without densifying the
+product. Used by catalog_retrieval and analytics_matcher; needs scipy
+(`sparse` is None without it).
+"""
+import re
+import zlib
+
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+except ImportError:
+    sparse = None
+
+# Hashed feature space (a power of two)
+N_FEATURES = 1 << 18
+
+# Similarity cells (queries x indexed rows) per sparse product, to bound its memory
+BLOCK_CELLS = 1 << 22
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _hashed(terms, n_features):
+    return [zlib.crc32(term.encode("utf-8")) & (n_features - 1) for term in terms]
+
+
+def word_terms(text, n_features=N_FEATURES):
+    """Feature ids of the words and adjacent word pairs of text."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return _hashed(words + [f"{first} {second}" for first, second in zip(words, words[1:])], n_features)
+
+
+def char_ngram_terms(text, n_features=N_FEATURES, n=3):
+    """
+    Feature ids of the character n-grams of each word of text, padded with a
+    space on both sides (so word starts and ends are features of their own).
+    """
+    terms = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        padded = f" {word} "
+        terms.extend(padded[start:start + n] for start in range(max(1, len(padded) - n + 1)))
+    return _hashed(terms, n_features)
+
+
+def term_frequencies(texts, terms=word_terms, n_features=N_FEATURES):
+    """CSR matrix of sublinear term frequencies (1 + log count), one row per text."""
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        features, counts = np.unique(terms(text, n_features), return_counts=True)
+        indices.append(features)
+        data.append(1.0 + np.log(counts))
+        indptr.append(indptr[-1] + len(features))
+    return sparse.csr_matrix(
+        (
+            np.concatenate(data) if data else np.zeros(0),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+            np.array(indptr),
+        ),
+        shape=(len(indptr) - 1, n_features),
+        dtype=np.float32,
+    )
+
+
+def weight(tf, idf):
+    """Scale a term-frequency matrix by IDF and each row to unit length, in place; returns it."""
+    # Works on the stored values: multiply() by the dense IDF row and a diagonal
+    # product would each build an O(n_features) or full-size intermediate per call
+    rows = np.repeat(np.arange(tf.shape[0]), np.diff(tf.indptr))
+    tf.data *= idf[tf.indices]
+    norms = np.sqrt(np.bincount(rows, weights=np.square(tf.data, dtype=np.float64), minlength=tf.shape[0]))
+    norms[norms == 0] = 1.0
+    tf.data /= norms[rows].astype(tf.dtype)
+    return tf
+
+
+class TfidfIndex:
+    """L2-normalized TF-IDF rows of the indexed texts, plus the IDF weights queries are vectorized with."""
+
+    def __init__(self, matrix, idf, terms=word_terms):
+        self.matrix = matrix
+        self.idf = idf
+        self.terms = terms
+        # Transposed once, so each query block is a CSR x CSR product
+        self._matrix_t = matrix.T.tocsr()
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def build(cls, texts, terms=word_terms, n_features=N_FEATURES):
+        tf = term_frequencies(texts, terms, n_features)
+        document_frequency = np.bincount(tf.indices, minlength=n_features)
+        idf = (np.log((1.0 + len(texts)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        return cls(weight(tf, idf), idf, terms)
+
+    def vectors(self, texts):
+        return weight(term_frequencies(texts, self.terms, self.matrix.shape[1]), self.idf)
+
+    def top_k_many(self, texts, k=10, min_score=0.0):
+        """
+        Return, for each query text, up to k (row id, score) pairs with
+        score > min_score, best first (equal scores in row order). Each block of
+        queries is one sparse product against the whole index.
+        """
+        if not len(self) or k <= 0:
+            return [[] for _ in texts]
+        block = max(1, BLOCK_CELLS // len(self))
+        results = []
+        for start in range(0, len(texts), block):
+            scores = self.vectors(texts[start:start + block]).dot(self._matrix_t)
+            for query in range(scores.shape[0]):
+                segment = slice(scores.indptr[query], scores.indptr[query + 1])
+                row_scores, row_ids = scores.data[segment], scores.indices[segment]
+                if len(row_scores) > k:
+                    best = np.argpartition(-row_scores, k - 1)[:k]
+                    row_scores, row_ids = row_scores[best], row_ids[best]
+                order = np.lexsort((row_ids, -row_scores))
+                results.append([
+                    (idx, score) for idx, score in zip(row_ids[order].tolist(), row_scores[order].tolist())
+                    if score > min_score
+                ])
+        return results
+
+    def save(self, path):
+        np.savez(
+            path,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape), idf=self.idf,
+        )
+
+    @classmethod
+    def load(cls, path, terms=word_terms):
+        with np.load(path) as arrays:
+            matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(arrays["shape"]))
+            return cls(matrix, arrays["idf"], terms)
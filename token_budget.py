@@ -0,0 +1,124 @@
+import math
+import os
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Default budget for the tagline user prompt, in tokens; override with
+# TAGLINE_TOKEN_BUDGET or TAGLINE_TOKEN_BUDGET_<BRAND> ("0" disables trimming)
+DEFAULT_TOKEN_BUDGET = 4000
+
+# Sample descriptions kept even when the prompt is over budget
+MIN_SAMPLES = 1
+
+_encoding = None
+
+
+def count_tokens(text):
+    """
+    Count the tokens of text offline with the gpt-4.1 tokenizer (o200k_base)
+    when tiktoken is installed, otherwise estimate four characters per token.
+    """
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def budget_from_env(brand, default=DEFAULT_TOKEN_BUDGET):
+    """Token budget for a brand from the environment (else default), or None when trimming is disabled."""
+    value = os.getenv(f"TAGLINE_TOKEN_BUDGET_{brand.upper()}", os.getenv("TAGLINE_TOKEN_BUDGET", str(default)))
+    return int(value) or None
+
+
+class TokenBudget:
+    """
+    Keep a tagline prompt within `max_tokens` by trimming its low-priority
+    sections in a fixed order: sample descriptions are dropped from the end
+    (down to MIN_SAMPLES), then the analytics report, then the image
+    description. The brand prefix and the product attributes are never trimmed.
+    """
+
+    def __init__(self, max_tokens=None, min_samples=MIN_SAMPLES):
+        self.max_tokens = max_tokens
+        self.min_samples = min_samples
+
+    def fit(self, layout, product_attributes, samples, analytics, product_description_image):
+        """
+        Render the prompt for one product within the budget.
+
+        Returns (prompt, report) where report holds the token count of every
+        section, the total, the budget, how many samples were kept and which
+        sections were trimmed.
+        """
+        samples = list(samples)
+        sections = layout.sections(product_attributes, samples, analytics, product_description_image)
+        sizes = {"prefix": layout.prefix_tokens}
+        sizes.update((name, count_tokens(text)) for name, text in sections.items())
+        kept = len(samples)
+        trimmed = []
+
+        def over_budget():
+            return self.max_tokens is not None and sum(sizes.values()) > self.max_tokens
+
+        if over_budget() and kept > self.min_samples:
+            # Each sample is tokenized once (as it appears in the rendered list) and
+            # its count subtracted as it is dropped; only the final section is re-counted
+            sample_tokens = [count_tokens(f"{sample!r}, ") for sample in samples]
+            while kept > self.min_samples and over_budget():
+                kept -= 1
+                sizes["samples"] -= sample_tokens[kept]
+
+            def render_samples(count):
+                sections["samples"] = layout.samples_section(samples[:count])
+                sizes["samples"] = count_tokens(sections["samples"])
+
+            # Token boundaries make the estimate a token or two off: settle on the
+            # largest sample count whose rendered section fits
+            render_samples(kept)
+            while kept > self.min_samples and over_budget():
+                kept -= 1
+                render_samples(kept)
+            while kept < len(samples) and not over_budget():
+                render_samples(kept + 1)
+                if over_budget():
+                    render_samples(kept)
+                    break
+                kept += 1
+            trimmed.append(f"samples {len(samples)}->{kept}")
+
+        for name in ("analytics", "image"):
+            if over_budget() and sections[name]:
+                sections[name] = ""
+                sizes[name] = 0
+                trimmed.append(name)
+
+        prompt = layout.join(sections)
+        report = {
+            "sections": sizes,
+            "total": sum(sizes.values()),
+            "budget": self.max_tokens,
+            "samples_kept": kept,
+            "samples_total": len(samples),
+            "trimmed": trimmed,
+        }
+        return prompt, report
+
+
+def format_report(report):
+    """One-line summary of a TokenBudget report for the per-item log."""
+    sections = ", ".join(f"{name} {size}" for name, size in report["sections"].items())
+    line = f"Prompt tokens: {report['total']}"
+    if report["budget"] is not None:
+        line += f"/{report['budget']}"
+    line += f" ({sections})"
+    if report["trimmed"]:
+        line += f" trimmed: {', '.join(report['trimmed'])}"
+    near_duplicates = report.get("near_duplicates")
+    if near_duplicates and near_duplicates["removed"]:
+        line += f" near-duplicate samples removed: {near_duplicates['removed']} ({near_duplicates['tokens']} tokens)"
+    return line
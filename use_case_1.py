@@ -2,474 +2,743 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import os
 import json
-import math
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 pd.set_option('display.max_columns', None)
 pd.set_option('display.max_rows', 100)
-from difflib import SequenceMatcher
-from docx import Document
 from image_details_extractor import generate_product_description
-from analytics_matcher import match_headline_to_keyword
-import re
+from analytics_matcher import recommend_keywords_many
+from mega_pdp_index import match_usecase, normalize_mega_value
+from brand_registry import BRANDS_CONFIG, BrandRegistry
+from catalog_retrieval import row_text
+from near_duplicates import NearDuplicateFilter, PruneStats
+from sample_cache import SampleCache
+from response_cache import cache_from_env
+from run_journal import RunJournal
+from results_export import export_results
+from prompt_layout import PACKED_RESULT_KEYS, SYSTEM_PROMPT, UsageTracker
+from token_budget import count_tokens, format_report
+from tagline_validator import ValidationStats
+import pipeline_timing
+from pipeline_timing import span
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Initialize the OpenAI client using your endpoint and token
 client = OpenAI(
     api_key=os.getenv("OPENAI_API_KEY"),
 )
 
-# Sheets: ['Model Training', '1 New Romance Copy Generation', '2 New Products Part of MegaPDP\u200b', '3 Products for SEO Enrichment', 'Full Catalog Short Descriptions']
-# Load Coach Rules
-coach_doc = Document("Documents/Coach Rules.docx")
-coach_rules = "\n".join([para.text for para in coach_doc.paragraphs])
-
-# Load Kate Spade Rules
-spade_doc = Document("Documents/Kate Spade Rules.docx")
-spade_rules = "\n".join([para.text for para in spade_doc.paragraphs])
-
-# Data File paths
-file1 = 'Documents\POC Product Selection- Coach Outlet.xlsx'
-file2 = 'Documents\POC Product Selection- Kate Spade.xlsx'
-
-coach_sheets = pd.read_excel(file1, sheet_name=None)
-spade_sheets = pd.read_excel(file2, sheet_name=None)
-
-def similarity(a: str, b: str) -> float:
-    """Return a float [0.0–1.0] for how similar two strings are."""
-    return SequenceMatcher(None, a, b).ratio()
-
-def get_tagline(product_attributes, product_description_image, analytics, company):
-    raw_mega_value = product_attributes.get("Mega PDP Group Value", "")
-    mega_value = str(raw_mega_value).lower() if pd.notna(raw_mega_value) else ""
-
-    if company =="Spade":
-        rules = spade_rules
-        mega_unique_values = (
-            set(val.lower() for val in spade_sheets["Model Training"]["Mega PDP Group Value"].dropna().unique())
-            .union(
-                val.lower() for val in spade_sheets["Full Catalog Short Descriptions"]["Mega PDP Group Value"].dropna().unique()
-            )
-        )
-
-        prod_old_description = []
-        matched_mega_values = []
-        match_type = ""
-
-        # Check for exact match
-        if mega_value in mega_unique_values:
-            print("Exact match")
-            match_type = "Exact"
-            for sheet_name in ("Model Training", "Full Catalog Short Descriptions"):
-                df = spade_sheets[sheet_name]
-                matches = df[df["Mega PDP Group Value"].str.lower() == mega_value]
-                if not matches.empty:
-                    prod_old_description.extend(matches["Short Description - en"].tolist())
-                    matched_mega_values.extend(matches["Mega PDP Group Value"].tolist())
-        
-        # If no exact match, try similar match
-        else:
-            similarity_scores = [(val, similarity(mega_value, val)) for val in mega_unique_values]
-            similarity_scores.sort(key=lambda x: x[1], reverse=True)
-            
-            if similarity_scores:
-                def fetch_matches(match_vals):
-                    for match_val in match_vals:
-                        for sheet_name in ("Model Training", "Full Catalog Short Descriptions"):
-                            df = spade_sheets[sheet_name]
-                            matches = df[df["Mega PDP Group Value"].str.lower() == match_val]
-                            if not matches.empty:
-                                prod_old_description.extend(matches["Short Description - en"].tolist())
-                                matched_mega_values.extend(matches["Mega PDP Group Value"].tolist())
-                                return True  # Stop at first valid match
-                    return False
-
-                top_match_val, top_match_score = similarity_scores[0]
-
-                if top_match_score >= 0.7:
-                    print(f"Found similar match: {top_match_val} (Score: {top_match_score})")
-                    match_type = "Similar threshold greater than 70%"
-                    fetch_matches([top_match_val])
-                else:
-                    print("No strong match found, returning top 10 matches")
-                    match_type = "Less than 70%"
-                    top_10_match_vals = [val for val, _ in similarity_scores[:10]]
-                    for val, score in similarity_scores[:10]:
-                        print(f"Match: {val} (Score: {score})")
-                    fetch_matches(top_10_match_vals)
-        blacklisted_keywords = [
-            "earned a treat", "NO.really", "s.a.l.e.", "expires", "celebrating", "psst", 
-            "customer", "hello", "sale on sale", "leaving soon", "Rewarding", "surprise", 
-            "elevate", "girl on the go", "hang", "you've bagged", "it's your final chance", 
-            "treating you to code", "e_legance", "elegant", "hot", "vintage", "discount", 
-            "attention", "you have", "glamorous", "kitsch", "lady", "splurge", "Official", 
-            "we're releasing", "discover", "ob_sessed", "got to", "major bag alert", "Officially", 
-            "releasing", "open immediately", "retro", "Win", "edgy", "all for you", 
-            "you're getting", "order today", "utterly", "#win", "open asap", "now trending", 
-            "confirm", "Announcement", "chic", "deal", "1-day", "yes", "all caps", 
-            "Announcing", "officially in stock", "adorable", "(1-day special!)", "take", 
-            "Lucky you", "Score", "cute", "fresh", "released", "explore", "presenting", 
-            "all eyes on", "classy", "gorgeous", "markdown", "Checkout", "no joke", 
-            "for you", "awesome", "hung", "Babe", "redeem", "Oooh", "get one", 
-            "is sure to excite", "smile", "snack", "hey", "reserved", "make one yours", 
-            "nice", "Knott", "as a thank you", "calling your name", "P_ssst", "Psst", 
-            "view", "tons", "oh", "no", "earn", "just in", "flirty", "secure", 
-            "hello gorgeous", "oof", "glow on", "just reduced", "sexy", "Deserve", 
-            "hello", "gorgeous", "sale just dropped", "buy more", "save more", "unlock", 
-            "name a more iconic", "Shop", "kind of time-sensitive", "we're confirming", 
-            "offering", "treat", "duo", "Styles made to last", "must-have", "alert", 
-            "compliments of us", "claim", "New you", "Enhance", "special message", 
-            "you're receiving", "upgraded", "we're giving you", "One-day", "No exclusions", 
-            "special feature", "just-reduced", "shipment", "hi there", "Snag", "Expires", 
-            "girl", "sale confirmed", "wristlet", "Hey you", "Continue", "Leaving soon", 
-            "because you rock", "you've secured", "all emojis", "Landed", "check out", 
-            "It's your final chance", "the modern woman", "fashion-forward individual", "smart", 
-            "PVC", "sophisticated", "modern wardrobe", "luxurious", "logo", 
-            "logo embellishment", "Saffiano PVC", "the modern woman", "smart", 
-            "sophisticated", "fashion-forward individual", "modern wardrobe", "sophistication", 
-            "we", "you", "casual day", "flair", "causal outings", "casual", 
-            "brighter days", "metal material", "sophistication", "trust us", "day party", 
-            "fashion-savvy individual", "elegance", "elegant", "modern fashion", "modern","precision edge painting"
-        ]
-    if company =="Coach":
-        rules= coach_rules
-        mega_unique_values = (
-            set(val.lower() for val in coach_sheets["Model Training"]["Mega PDP Group Value"].dropna().unique())
-            .union(
-                val.lower() for val in coach_sheets["Full Catalog Short Descriptions"]["Mega PDP Group Value"].dropna().unique()
-            )
-        )
-
-        prod_old_description = []
-        matched_mega_values = []
-        match_type = ""
-
-        # Check for exact match
-        if mega_value in mega_unique_values:
-            print("Exact match")
-            match_type = "Exact"
-            for sheet_name in ("Model Training", "Full Catalog Short Descriptions"):
-                df = coach_sheets[sheet_name]
-                matches = df[df["Mega PDP Group Value"].str.lower() == mega_value]
-                if not matches.empty:
-                    prod_old_description.extend(matches["Short Description - en"].tolist())
-                    matched_mega_values.extend(matches["Mega PDP Group Value"].tolist())
-        
-        # If no exact match, try similar match
-        else:
-            similarity_scores = [(val, similarity(mega_value, val)) for val in mega_unique_values]
-            similarity_scores.sort(key=lambda x: x[1], reverse=True)
-            
-            if similarity_scores:
-                def fetch_matches(match_vals):
-                    for match_val in match_vals:
-                        for sheet_name in ("Model Training", "Full Catalog Short Descriptions"):
-                            df = coach_sheets[sheet_name]
-                            matches = df[df["Mega PDP Group Value"].str.lower() == match_val]
-                            if not matches.empty:
-                                prod_old_description.extend(matches["Short Description - en"].tolist())
-                                matched_mega_values.extend(matches["Mega PDP Group Value"].tolist())
-                                return True  # Stop at first valid match
-                    return False
-
-                top_match_val, top_match_score = similarity_scores[0]
-
-                if top_match_score >= 0.7:
-                    print(f"Found similar match: {top_match_val} (Score: {top_match_score})")
-                    match_type = "Similar threshold greater than 70%"
-                    fetch_matches([top_match_val])
-                else:
-                    print("No strong match found, returning top 10 matches")
-                    match_type = "Less than 70%"
-                    top_10_match_vals = [val for val, _ in similarity_scores[:10]]
-                    for val, score in similarity_scores[:10]:
-                        print(f"Match: {val} (Score: {score})")
-                    fetch_matches(top_10_match_vals)
-        blacklisted_keywords = [
-            "inspired by", "chic", "exudes sophistication", "gen-z customer", "gen-z", 
-            "aesthetic", "affordable", "ageless", "body", "chic", "coachie", "couture", 
-            "craftsman", "customer", "cute", "dainty", "daintier", "darling", "deal", 
-            "delightful", "designer", "discount", "disruptive", "don", "donning", 
-            "easy win", "elegant", "elegance", "embellished", "enchanting", "engineered", 
-            "eternal", "expressive luxury", "fabulous", "fabulousness", "fashion", 
-            "fashion lover", "fashionista", "fave", "footwear", "gang", "gender-neutral", 
-            "handbag", "hot", "it bag", "it girl", "it’s giving", "jet-set", "lovely", 
-            "multifunctional", "must have", "new you", "obsess", "obsessed", "mindful", 
-            "green", "conscious", "eco-conscious", "pioneering", "pleasing", "pretty", 
-            "purse", "quiet luxury", "sale", "sassy", "savage", "sensations", "sleek", 
-            "splendid", "sueded", "sustainable", "szn", "tender", "treasures", 
-            "trendsetter", "turn heads", "unearth", "unveil", "unveiling", "uptown style", 
-            "downtown style", "urban", "vibes", "but make it fashion", "meet", 
-            "experience", "introducing", "just", "literally", "figuratively", 
-            "audacious", "pvc", "PVC", "mundane", "nitty-gritties", "beauty scores", 
-            "best", "boast", "booster", "statement", "promise", "declaration", "go-to", 
-            "taste", "impeccable", "pretty face", "testament", "touches", "must-have", 
-            "impraczcal", "unassuming", "overlook", "unusual", "friend", "flair", 
-            "fierce", "efforzless", "glamour", "outing", "fashionable", "stylish", 
-            "more than a pretty face", "your new best friend", "accessories collection", 
-            "boasts", "modern fashion", "this is Coach Outlet's promise to you", 
-            "declaration of style", "testament to your impeccable taste", 
-            "finishing touches from Coach Outlet", "fashion adventures", "flair", 
-            "audacious modern style", "this beauty scores high", "meziculously", 
-            "captivating", "aesthetics", "simplicity and class", "dash of the unusual", 
-            "crafted to fulfill", "unassuming elegance", "it's impractical to overlook", 
-            "sexy", "let's talk about", "inspiration can come", "fall in love", 
-            "inspiration can strike", "picture this", "picture themselves", "imagine", 
-            "bio-attributed", "bio-based", "biodegradable", "bio-finished", 
-            "carbon neutral", "certified b corp", "chemical recycling", "circular", 
-            "closed loop", "compostable", "fair trade", "FSC", "forest stewardship", 
-            "council", "mechanical recycling", "natural", "PEFC", "recyclable", 
-            "upcycled", "SFI", "responsible", "synthetic", "traceable", "transparent", 
-            "vegan", "zero waste"
-        ]
-
-    prod_old_description = list(set(prod_old_description))
-    def remove_blacklisted_keywords(paragraphs, blacklisted_keywords):
-        cleaned_paragraphs = []
-        
-        for paragraph in paragraphs:
-            if not isinstance(paragraph, str) or not paragraph.strip():
-                continue  # Skip NaN, empty strings, or non-string values
-            
-            cleaned_paragraph = paragraph
-            for keyword in blacklisted_keywords:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                cleaned_paragraph = re.sub(pattern, '', cleaned_paragraph, flags=re.IGNORECASE)
-            
-            cleaned_paragraph = ' '.join(cleaned_paragraph.split())
-            cleaned_paragraphs.append(cleaned_paragraph)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_paragraphs = [p for p in cleaned_paragraphs if not (p.lower() in seen or seen.add(p.lower()))]
-        
-        return unique_paragraphs
-
-
-    # Apply the function to prod_old_description
-    prod_old_description = remove_blacklisted_keywords(prod_old_description, blacklisted_keywords)
-    prompt = [
-    "Instructions:",
-    "1. You are given a set of rules. Follow them exactly to generate a new tagline.",
-    "2. Do NOT repeat any word in the tagline.",
-    "3. Do NOT include the phrase “what fits inside.”",
-    "4. Do NOT include any city-specific references.",
-    "5. Do NOT mention pairing dress or attire.",
-    "6. Do NOT use general phrases—be product-specific.",
-    "7. Maintain a natural, authentic tone.",
-    "8. Strictly avoid all blacklisted words (severe penalty for violations).",
-    "9. Strictly follow the structure and the content of sample given, else you will be heavily penalized.",
-    "**You must follow Instructions and rules at any cost, else you will be heavily penalized.**",
-    "####",
-    "Rules:",
-    f"{rules}",
-    "####",
-    ]
+# On-disk cache of tagline completions (see response_cache.cache_from_env for the TAGLINE_CACHE_* settings)
+tagline_cache = cache_from_env("TAGLINE_CACHE", "cache/tagline_responses.sqlite3")
 
-    if prod_old_description != "":
-        prompt.append("**Strictly follow the structure and the content of sample given below, to generate the new tagline. Keep the structure and content same to the given sample. Do not add Blacklisted words.**")
-        prompt.append(f"{prod_old_description}")
-
-    prompt += [
-        "####",
-        "SEO Guidance:",
-        "Generate an SEO keyword list.",
-        "Keyword Hierarchy (incorporate these into your tagline where natural):",
-        "- **Primary Keywords** - Describing product type (example - Flap shoulder bag, Colorblocked bag, Convertible bag)",
-        "- **Secondary Keywords** - Describing characteristics (example - Pebbled leather, Colorblocked leather, Classic flap silhouette, Adjustable crossbody strap, Convertible design)",
-        "- **Tertiary Keywords** - Describing function - (example - Optional crossbody strap, Everyday bag, Versatile handbag)",
-    ]
+# Rows processed concurrently by process_usecase in main(); 1 keeps the run sequential
+MAX_WORKERS = int(os.getenv("TAGLINE_MAX_WORKERS", "1"))
 
-    if analytics != {}:
-        prompt+= [
-            "####",
-            "Analyze the Google Analytics report below:", 
-            f"{analytics}"
-        ]
+# Products generated per packed request by main(), grouped by Mega PDP group; 1 sends one request per product
+PACK_SIZE = int(os.getenv("TAGLINE_PACK_SIZE", "1"))
 
-    if product_description_image != {}:
-        prompt.extend(["####"," Below is the visual description of the image. Do take into account while framing the Tagline.",
-            f"{product_description_image}"])
-    
-    prompt.append("####")
-    prompt.append("Below are the attributes for the product:")
+# Regeneration attempts for a tagline that breaks a locally checked rule; 0 (the default
+# until the checks' false-positive rate on live output is known) only reports violations
+MAX_REGENERATIONS = int(os.getenv("TAGLINE_MAX_REGENERATIONS", "0"))
 
-     # Dynamically iterate over every top-level key in the dictionary
-    for key, value in product_attributes.items():
-        if key in ["What Fits Inside - en","Iteration","Tech Fit - en","Primary Digital Asset URL","Non-Primary Digital Asset URL"]:
-            continue
-        if value == "" or (isinstance(value, float) and math.isnan(value)):
-            continue
-        pretty_value = json.dumps(value, indent=2, ensure_ascii=False)
-        # Prepend each line of the value with two spaces so it's clear it belongs under the key
-        indented_value = "\n".join([f"  {line}" for line in pretty_value.splitlines()])
-        # Append a line like "Key:" followed by the indented JSON value
-        prompt.append(f"- {key}:\n{indented_value}")
-
-    prompt.extend([
-        f"Before generating the tagline, Please check: Do NOT use these blacklisted words under any circumstances: {blacklisted_keywords}.",
-        "Do not use you, your,etc in tagline."
-    ])
-
-    prompt.extend([
-    "Format your response exactly like this (so it’s easy to parse):",
-        "```json",
-        "{",
-        '  "editorial_tagline": "...",',
-        '  "SEO Keyword 1": ["...", "...", "..."],',
-        '  "SEO Keyword 2": ["...", "...", "..."],',
-        '  "SEO Keyword 3": ["...", "...", "..."]',
-        "}",
-        "```"
-    ])
-
-    full_prompt = "\n".join(prompt)
-
-    system_prompts = [
-    "You are a world-class luxury fashion editor. Do NOT add Blacklisted Words in the tagline."
-    "Instructions:",
-    "1. You are given a set of rules. Follow them exactly to generate a new tagline.",
-    "2. Do NOT repeat any word in the tagline.",
-    "3. Do NOT include the phrase “what fits inside.”",
-    "4. Do NOT include any city-specific references.",
-    "5. Do NOT mention pairing dress or attire.",
-    "6. Do NOT use general phrases—be product-specific.",
-    "7. Maintain a natural, authentic tone.",
-    "8. Strictly avoid all blacklisted words (severe penalty for violations).",
-    "9. Strictly follow the structure and the content of sample given, else you will be heavily penalized.",
-    "**You must follow Instructions and rules at any cost, else you will be heavily penalized.**",
-    ]
+# Per-row checkpoint journal used by main(); delete the file to start a fresh run
+JOURNAL_PATH = os.getenv("TAGLINE_JOURNAL", "checkpoints/run_journal.jsonl")
 
-    system_prompts = "\n".join(system_prompts)
+# Directory of the combined result workbooks (All_Usecases_Results.xlsx / All_Results_New_Format.xlsx)
+RESULTS_DIR = os.getenv("TAGLINE_RESULTS_DIR", ".")
 
-    # print(full_prompt)
+# Per-brand result workbooks (<brand>_All_Usecases_Results.xlsx / <brand>_Result_Formatted.xlsx); kept out
+# of New_Results, which holds the committed reference workbooks
+BRAND_RESULTS_DIR = os.getenv("TAGLINE_BRAND_RESULTS_DIR", "results")
 
-    response = client.chat.completions.create(
+# Sheets: ['Model Training', '1 New Romance Copy Generation', '2 New Products Part of MegaPDP\u200b', '3 Products for SEO Enrichment', 'Full Catalog Short Descriptions']
+# Brands (rules document, workbook, blacklist, thresholds, use-case sheets) come from
+# brands.json; each brand's blacklist matcher, validator, prompt prefix and token budget
+# are compiled once here and its Mega PDP index on first use (see brand_registry).
+# Rules documents and workbooks are read through snapshots under cache/snapshots that are
+# rebuilt only when the source file changes (see workbook_snapshot)
+brands = BrandRegistry.from_config(BRANDS_CONFIG)
+
+# Match type of rows whose samples come from attribute-similarity retrieval (see catalog_retrieval)
+RETRIEVAL_MATCH_TYPE = "Attribute similarity"
+
+# Per-run counts of the local rule checks
+validation_stats = ValidationStats()
+
+# Cleaned few-shot samples per (brand, Mega PDP group, rules/blacklist version)
+sample_cache = SampleCache(maxsize=2048)
+
+# Near-duplicate sample pruning (TAGLINE_NEAR_DUPLICATE_THRESHOLD) and its per-item counts
+near_duplicate_filter = NearDuplicateFilter()
+near_duplicate_stats = PruneStats()
+
+# Token usage (including provider-cached prompt tokens) of the tagline completions
+tagline_usage = UsageTracker()
+
+def build_samples(mega_match, blacklist):
+    """
+    Deduplicate and blacklist-clean a match's sample descriptions, then drop
+    near duplicates, keeping its match metadata and what the pruning removed.
+    """
+    with span("blacklist_scrub"):
+        cleaned = blacklist.clean(list(dict.fromkeys(mega_match["Sample Descriptions"])))
+    with span("near_duplicate_prune"):
+        kept, removed = near_duplicate_filter.prune(cleaned)
+    return {
+        "Match_Type": mega_match["Match_Type"],
+        "Matched OLD Mega PDP Value": list(mega_match["Matched OLD Mega PDP Value"]),
+        "Old Description": kept,
+        "Near Duplicates": {"removed": len(removed), "tokens": sum(count_tokens(text) for text in removed)},
+    }
+
+def resolve_samples(product_attributes, company, mega_match=None):
+    """Return (cleaned samples, blacklist matcher) for a product's Mega PDP group."""
+    mega_value = normalize_mega_value(product_attributes.get("Mega PDP Group Value", ""))
+    brand = brands[company]
+
+    # Cleaned samples are shared by every product of the same group (and, for
+    # retrieved samples, the same catalog rows); the row's entry from the use-case
+    # match table is reused when the caller has one
+    retrieved = tuple(mega_match.get("Retrieved Items") or ()) if mega_match is not None else ()
+    samples = sample_cache.get_or_build(
+        (company, mega_value, brand.samples_version, retrieved),
+        lambda: build_samples(mega_match if mega_match is not None else brand.index.match(mega_value), brand.blacklist),
+    )
+    return samples, brand.blacklist
+
+def tagline_request(full_prompt):
+    return dict(
             model="gpt-4.1",
             messages=[
-                {"role": "system", "content": system_prompts},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": full_prompt}
             ],
             temperature=0.3,
             response_format={"type": "json_object"}
         )
-    
-    res = json.loads(response.choices[0].message.content.strip())
 
-    found_blacklisted_keywords = []
+def build_tagline_request(product_attributes, product_description_image, analytics, company, mega_match=None):
+    """
+    Resolve the samples and render the tagline prompt for one product.
+    Returns (request, context) where context carries what get_tagline needs to
+    post-process the response.
+    """
+    samples, blacklist = resolve_samples(product_attributes, company, mega_match)
+    match_type = samples["Match_Type"]
+    matched_mega_values = list(samples["Matched OLD Mega PDP Value"])
+    prod_old_description = list(samples["Old Description"])
+    # Brand-static prefix first so the provider can reuse its prompt cache across products;
+    # low-priority sections are trimmed when the prompt is over the brand's token budget
+    with span("prompt_render"):
+        full_prompt, prompt_report = brands[company].budget.fit(
+            brands[company].prompt, product_attributes, prod_old_description, analytics, product_description_image,
+        )
+    prod_old_description = prod_old_description[:prompt_report["samples_kept"]]
+    prompt_report["near_duplicates"] = samples["Near Duplicates"]
+    logger.debug(format_report(prompt_report))
+
+    request = tagline_request(full_prompt)
+
+    context = {
+        "blacklist": blacklist,
+        "Old Description": prod_old_description,
+        "Matched OLD Mega PDP Value": matched_mega_values,
+        "Prompt": full_prompt,
+        "Match_Type": match_type,
+        "Prompt Tokens": prompt_report,
+    }
+    return request, context
+
+def parse_tagline(content):
+    """The JSON object of a tagline response; raises ValueError/KeyError when it is not one with a tagline."""
+    res = json.loads(content.strip())
+    if not isinstance(res, dict):
+        raise ValueError("Tagline response is not a JSON object")
+    res["editorial_tagline"]
+    return res
 
-    tagline = res["editorial_tagline"]
-    for keyword in blacklisted_keywords:
-        pattern = r'\b' + re.escape(keyword) + r'\b'
-        if re.search(pattern, tagline, re.IGNORECASE):
-            found_blacklisted_keywords.append(keyword)
-        
+def parse_packed(content):
+    """The "items" list of a packed tagline response; raises ValueError when it has none."""
+    entries = json.loads(content.strip())
+    if not isinstance(entries, dict) or not isinstance(entries.get("items"), list):
+        raise ValueError('Packed response has no "items" list')
+    return entries["items"]
+
+def complete_tagline(request, validate=parse_tagline):
+    """
+    Return the model's response content for a tagline request, via the on-disk
+    cache. Only content that validate() accepts is cached, so a malformed reply
+    is requested again on the next run instead of being replayed.
+    """
+    def call_model():
+        call_start = time.perf_counter()
+        with span("llm_call"):
+            response = client.chat.completions.create(**request)
+        tagline_usage.record(response.usage, time.perf_counter() - call_start)
+        return response.choices[0].message.content
+
+    # Identical requests are served from the on-disk cache
+    with span("tagline_request"):
+        if tagline_cache is not None:
+            return tagline_cache.get_or_call(request, call_model, validate)
+        return call_model()
+
+def report_blacklisted(tagline, blacklist):
+    found_blacklisted_keywords = blacklist.find(tagline)
 
     if found_blacklisted_keywords:
-        print(f"🚨 🚨 🚨 🚨 🚨 🚨 Blacklisted keywords present: {', '.join(set(found_blacklisted_keywords))},")
-        print(tagline)
+        logger.warning(f"🚨 🚨 🚨 🚨 🚨 🚨 Blacklisted keywords present: {', '.join(set(found_blacklisted_keywords))},")
+        logger.warning(tagline)
     else:
-        print("No blacklisted keywords found.")
+        logger.debug("No blacklisted keywords found.")
+
+def get_tagline(product_attributes, product_description_image, analytics, company, mega_match=None, feedback=None):
+    """
+    Generate the tagline for one product. feedback is a list of (previous
+    response, violated rules) pairs replayed after the prompt when regenerating
+    a tagline that broke a rule.
+    """
+    request, context = build_tagline_request(product_attributes, product_description_image, analytics, company, mega_match)
+    for previous_content, violations in feedback or []:
+        request["messages"] += [
+            {"role": "assistant", "content": previous_content},
+            {"role": "user", "content": "\n".join([
+                "The tagline above breaks these rules:",
+                *[f"- {violation}" for violation in violations],
+                "Rewrite it so it follows every instruction and rule, in the same JSON format.",
+            ])},
+        ]
+    res = parse_tagline(complete_tagline(request))
+    report_blacklisted(res["editorial_tagline"], context["blacklist"])
 
-    res["Old Description"] = prod_old_description
-    res["Matched OLD Mega PDP Value"] = matched_mega_values
-    res["Prompt"] = full_prompt
-    res["Match_Type"] = match_type
-    print(res["editorial_tagline"])
+    for column in ("Old Description", "Matched OLD Mega PDP Value", "Prompt", "Match_Type", "Prompt Tokens"):
+        res[column] = context[column]
+    logger.debug(res["editorial_tagline"])
 
     return res
 
-def process_usecase(usecase_df, brand):
-    data = usecase_df.to_dict(orient='records')
-    output_data = []
-    
-    for item in data:
-        print(f"Processing {item['Item#']}")
-        image = item.get("Primary Digital Asset URL", "")
-        image2 = item.get("Primary Digital Asset URL", "")  # Note: This might need adjustment if a secondary image column exists
-        raw_urls = f"{image}`{image2}".replace("`", ",").split(",")
-        images = list(filter(None, map(str.strip, raw_urls)))
-        
-        if images:
-            product_description_image = generate_product_description(images)
-        else:
-            product_description_image = {}
-        
-        product_name = item.get("Web Product Name - en", [])  # Adjusted to match requested column name
-        if product_name:
-            analytics = match_headline_to_keyword(product_name)
-        else:
-            analytics = {}
-        
-        luxury_tagline = get_tagline(item, product_description_image, analytics, brand)
+def get_taglines_packed(items, product_description_images, analytics_matches, company, mega_matches):
+    """
+    Generate taglines for several products with one request. The products share
+    the brand prefix, products of the same Mega PDP group share their samples,
+    and the model answers with one entry per "Item#".
+
+    Returns {str(Item#): result} for the entries that came back well-formed;
+    products that are missing from the response or malformed are left out so
+    the caller can fall back to get_tagline.
+    """
+    resolved = [resolve_samples(item, company, mega_match) for item, mega_match in zip(items, mega_matches)]
+    layout = brands[company].prompt
+    # Each product's sections are held to the brand's token budget as they would be
+    # in its own prompt, trimming the same low-priority sections
+    products = []
+    trimmed = []
+    with span("prompt_render"):
+        for item, (samples, _), analytics, product_description_image in zip(items, resolved, analytics_matches, product_description_images):
+            _, report = brands[company].budget.fit(layout, item, samples["Old Description"], analytics, product_description_image)
+            products.append((
+                item["Item#"],
+                item,
+                list(samples["Old Description"])[:report["samples_kept"]],
+                [] if "analytics" in report["trimmed"] else analytics,
+                {} if "image" in report["trimmed"] else product_description_image,
+            ))
+            trimmed.extend(f"{item['Item#']} {name}" for name in report["trimmed"])
+        full_prompt = layout.render_packed(products)
+    prompt_report = {
+        "sections": {"prefix": layout.prefix_tokens, "products": count_tokens(full_prompt[len(layout.prefix):])},
+        "total": count_tokens(full_prompt),
+        "budget": brands[company].budget.max_tokens,
+        "trimmed": trimmed,
+        "products": len(items),
+    }
+    logger.debug(format_report(prompt_report) + f" for {len(items)} products (budget per product)")
+
+    try:
+        entries = parse_packed(complete_tagline(tagline_request(full_prompt), parse_packed))
+    except ValueError as e:
+        logger.warning(f"⚠️ Packed response could not be parsed: {e}")
+        return {}
+
+    resolved_by_item = {
+        str(item["Item#"]): (samples, blacklist, old_descriptions)
+        for item, (samples, blacklist), (_, _, old_descriptions, _, _) in zip(items, resolved, products)
+    }
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or str(entry.get("Item#")) not in resolved_by_item:
+            continue
+        if not isinstance(entry.get("editorial_tagline"), str) or not entry["editorial_tagline"].strip():
+            continue
+        if any(key not in entry for key in PACKED_RESULT_KEYS):
+            continue
+        samples, blacklist, old_descriptions = resolved_by_item[str(entry["Item#"])]
+        res = {key: value for key, value in entry.items() if key != "Item#"}
+        report_blacklisted(res["editorial_tagline"], blacklist)
+        res["Old Description"] = old_descriptions
+        res["Matched OLD Mega PDP Value"] = list(samples["Matched OLD Mega PDP Value"])
+        res["Prompt"] = full_prompt
+        res["Match_Type"] = samples["Match_Type"]
+        res["Prompt Tokens"] = dict(prompt_report, near_duplicates=samples["Near Duplicates"])
+        logger.debug(res["editorial_tagline"])
+        results.setdefault(str(entry["Item#"]), res)
+    return results
+
+def item_images(item):
+    """Image URLs of a use-case row."""
+    image = item.get("Primary Digital Asset URL", "")
+    image2 = item.get("Primary Digital Asset URL", "")  # Note: This might need adjustment if a secondary image column exists
+    raw_urls = f"{image}`{image2}".replace("`", ",").split(",")
+    return list(filter(None, map(str.strip, raw_urls)))
+
+def describe_images(item):
+    images = item_images(item)
+    if not images:
+        return {}
+    with span("image_analysis"):
+        return generate_product_description(images)
+
+def record_near_duplicates(luxury_tagline):
+    """Count the near-duplicate samples pruned for one generated row (regenerations and retries are not counted again)."""
+    near_duplicates = luxury_tagline["Prompt Tokens"]["near_duplicates"]
+    near_duplicate_stats.record(near_duplicates["removed"], near_duplicates["tokens"])
+
+def merge_tagline(item, luxury_tagline):
+    """The output row: a copy of the sheet row with the tagline result merged in (the row itself is left as read)."""
+    row = dict(item)
+    if isinstance(luxury_tagline, dict):
+        row.update(luxury_tagline)
+    else:
+        row["Luxury Tagline"] = luxury_tagline
+    return row
+
+def check_rules(item, attributes, brand):
+    """Record the locally checked rule violations of a generated row (attributes: its sheet row)."""
+    with span("rule_check"):
+        item["Rule Violations"] = brands[brand].validator.violations(item.get("editorial_tagline"), attributes)
+    item["Regenerations"] = 0
+    validation_stats.record_check(item["Rule Violations"])
+    return item
+
+def regenerate_item(item, attributes, product_description_image, mega_match, analytics, brand, max_retries=MAX_REGENERATIONS):
+    """
+    Regenerate the tagline of a row that breaks a rule, telling the model which
+    rules failed, until it passes or max_retries calls were made. The image
+    description is the one the row was first generated with.
+    """
+    logger.info(f"Regenerating {item['Item#']}: {'; '.join(item['Rule Violations'])}")
+    violations = item["Rule Violations"]
+    feedback = []
+    attempts = 0
+    while violations and attempts < max_retries:
+        previous_content = json.dumps({key: item.get(key) for key in PACKED_RESULT_KEYS}, ensure_ascii=False)
+        feedback.append((previous_content, violations))
+        item = merge_tagline(item, get_tagline(dict(attributes), product_description_image, analytics, brand, mega_match, feedback))
+        attempts += 1
+        violations = brands[brand].validator.violations(item["editorial_tagline"], attributes)
+
+    item["Rule Violations"] = violations
+    item["Regenerations"] = attempts
+    validation_stats.record_regeneration(attempts, violations)
+    return item
+
+def process_item(item, mega_match, analytics, brand):
+    """
+    Describe the images and generate the tagline for one use-case row.
+    Returns (row, image description).
+    """
+    item_start = time.perf_counter()
+    logger.debug(f"Processing {item['Item#']}")
+    with pipeline_timing.item(item["Item#"]):
+        product_description_image = describe_images(item)
         
-        if isinstance(luxury_tagline, dict):
-            for k, v in luxury_tagline.items():
-                item[k] = v
+        luxury_tagline = get_tagline(item, product_description_image, analytics, brand, mega_match)
+        record_near_duplicates(luxury_tagline)
+        row = check_rules(merge_tagline(item, luxury_tagline), item, brand)
+
+    logger.info(f"Finished {item['Item#']} in {time.perf_counter() - item_start:.2f}s")
+    return row, product_description_image
+
+def process_pack(items, mega_matches, analytics_matches, brand):
+    """
+    Describe the images and generate the taglines for several rows with one
+    packed request. Rows without a usable entry in the
+    packed response are generated one by one.
+    Returns (rows, image descriptions), in the order of items.
+    """
+    if len(items) == 1:
+        row, product_description_image = process_item(items[0], mega_matches[0], analytics_matches[0], brand)
+        return [row], [product_description_image]
+
+    pack_start = time.perf_counter()
+    item_numbers = ", ".join(str(item["Item#"]) for item in items)
+    logger.debug(f"Processing {item_numbers} as one request")
+    with pipeline_timing.item(item_numbers):
+        product_description_images = [describe_images(item) for item in items]
+        packed = get_taglines_packed(items, product_description_images, analytics_matches, brand, mega_matches)
+
+        rows = []
+        for item, product_description_image, mega_match, analytics in zip(items, product_description_images, mega_matches, analytics_matches):
+            luxury_tagline = packed.get(str(item["Item#"]))
+            if luxury_tagline is None:
+                logger.warning(f"⚠️ No usable packed result for {item['Item#']}, generating it on its own")
+                luxury_tagline = get_tagline(item, product_description_image, analytics, brand, mega_match)
+            record_near_duplicates(luxury_tagline)
+            rows.append(check_rules(merge_tagline(item, luxury_tagline), item, brand))
+
+    logger.info(f"Finished {len(items)} items in {time.perf_counter() - pack_start:.2f}s")
+    return rows, product_description_images
+
+def stats_since(before, after):
+    """
+    The counts of `after` minus those of `before`, two summaries of the same
+    process-wide counters, so one call's share can be logged (rates are not kept).
+    """
+    delta = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            delta[key] = {name: count - before[key].get(name, 0) for name, count in value.items() if count != before[key].get(name, 0)}
+        elif key not in ("violation_rate", "hit_rate", "cached_share", "avg_latency"):
+            delta[key] = value - before[key]
+    return delta
+
+def ratio(part, whole):
+    return part / whole if whole else 0.0
+
+def pack_positions(data, pack_size):
+    """
+    Split row positions into packs of at most pack_size rows, with rows of the
+    same normalized Mega PDP group value kept adjacent (groups in order of first
+    appearance) so they share a pack, and its samples, where possible.
+    """
+    groups = {}
+    for pos, item in enumerate(data):
+        groups.setdefault(normalize_mega_value(item.get("Mega PDP Group Value", "")), []).append(pos)
+    ordered = [pos for positions in groups.values() for pos in positions]
+    return [ordered[start:start + pack_size] for start in range(0, len(ordered), pack_size)]
+
+def retrieve_samples(data, mega_matches, brand):
+    """
+    Give every row whose Mega PDP group has no exact or similar match the catalog
+    rows most similar to its attributes as samples (Match_Type "Attribute
+    similarity"), answering the whole sheet with one retrieval query.
+    """
+    retrieval = brands[brand].retrieval
+    mega_index = brands[brand].index
+    weak = [pos for pos, mega_match in enumerate(mega_matches) if mega_index.is_weak(mega_match)]
+    if retrieval is None or not weak:
+        return mega_matches
+
+    results = retrieval.top_k_many([row_text(data[pos]) for pos in weak], brands[brand].retrieval_top_k)
+    for pos, hits in zip(weak, results):
+        if not hits:
+            continue
+        mega_matches[pos] = dict(
+            mega_matches[pos],
+            **{
+                "Match_Type": RETRIEVAL_MATCH_TYPE,
+                "Matched OLD Mega PDP Value": [row["Mega PDP Group Value"] for row, _ in hits],
+                "Sample Descriptions": [row["description"] for row, _ in hits],
+                "Retrieved Items": [f"{row['sheet']}:{row['Item#']}" for row, _ in hits],
+            },
+        )
+    logger.debug(f"Retrieved samples by attribute similarity for {len(weak)} weakly matched rows")
+    return mega_matches
+
+def match_rows(usecase_df, data, brand):
+    """
+    Resolve the Mega PDP match and recommended analytics keywords of every row of
+    a use-case sheet (data is usecase_df as records). Returns (mega_matches, analytics_matches).
+    """
+    match_start = time.perf_counter()
+    mega_index = brands[brand].index
+    with span("mega_pdp_match"):
+        match_table = match_usecase(usecase_df, mega_index)
+        mega_matches = match_table.to_dict(orient='records')
+    with span("catalog_retrieval"):
+        retrieve_samples(data, mega_matches, brand)
+    product_names = [item.get("Web Product Name - en", []) for item in data]  # Adjusted to match requested column name
+    with span("analytics_lookup"):
+        # Top-k keywords of the whole sheet in one batch of sparse products
+        analytics_matches = recommend_keywords_many(product_names)
+    logger.info(f"Matched {len(match_table)} rows in {time.perf_counter() - match_start:.3f}s")
+    return mega_matches, analytics_matches
+
+def process_usecase(usecase_df, brand, max_workers=1, sheet_name=None, journal=None, return_rows=True, pack_size=1):
+    """
+    Generate taglines for every row of a use-case sheet.
+
+    With max_workers > 1, up to that many rows are in flight at once on a thread
+    pool (image description and tagline calls are network bound); output rows keep
+    the sheet order either way.
+
+    With pack_size > 1, up to pack_size rows are generated per packed request,
+    rows of the same Mega PDP group together (see get_taglines_packed).
+
+    Every tagline is checked against the mechanically verifiable rules (see
+    tagline_validator); rows that break one are regenerated afterwards with the
+    failed rules fed back, at most MAX_REGENERATIONS times each.
+
+    With a RunJournal, every finished row is streamed to it under (brand,
+    sheet_name, "Item#") and the brand's input version, and rows already in the
+    journal under that version are not generated again.
+    Pass return_rows=False to keep nothing in memory (export the workbooks from
+    the journal afterwards); otherwise the sheet's rows are returned as a DataFrame.
+    """
+    data = usecase_df.to_dict(orient='records')
+
+    # The run counters are process-wide (a pool worker runs several jobs); the
+    # summary below reports this call's share
+    validation_before = validation_stats.summary()
+    pruning_before = near_duplicate_stats.summary()
+    cache_before = sample_cache.stats()
+    usage_before = tagline_usage.summary()
+
+    # Rows finished by an earlier, interrupted run from the same rules, blacklist and
+    # workbook are already in the journal; rows from other inputs are generated again
+    version = brands[brand].input_version
+    pending = [
+        pos for pos, item in enumerate(data)
+        if journal is None or not journal.is_done(brand, sheet_name, item["Item#"], version)
+    ]
+    if journal is not None:
+        stale = sum(journal.is_done(brand, sheet_name, data[pos]["Item#"]) for pos in pending)
+        if stale:
+            logger.warning(f"{brand} / {sheet_name}: {stale} journaled rows were generated from other rules, blacklist "
+                           f"or workbook contents and are generated again")
+    if len(pending) < len(data):
+        logger.info(f"Resuming {brand} / {sheet_name}: {len(data) - len(pending)} of {len(data)} rows already in the journal")
+    pending_df = usecase_df.iloc[pending]
+    pending_data = [data[pos] for pos in pending]
+
+    # Resolve every row's Mega PDP match and analytics keyword before any LLM call
+    mega_matches, analytics_matches = match_rows(pending_df, pending_data, brand)
+
+    def run_pack(positions):
+        items, product_description_images = process_pack(
+            [pending_data[pos] for pos in positions],
+            [mega_matches[pos] for pos in positions],
+            [analytics_matches[pos] for pos in positions],
+            brand,
+        )
+        if journal is not None:
+            for item in items:
+                with span("journal_write"):
+                    journal.append(brand, sheet_name, item["Item#"], item, version)
+        if not return_rows:
+            # Journaled rows are not kept: drop the sheet row and, unless the
+            # regeneration pass needs them, its matches
+            for pos, item in zip(positions, items):
+                data[pending[pos]] = pending_data[pos] = None
+                if not item["Rule Violations"]:
+                    mega_matches[pos] = analytics_matches[pos] = None
+        # Rows breaking a rule are kept for the regeneration pass (with the image
+        # description they were generated with) even when rows are not returned
+        return [
+            (item if return_rows or item["Rule Violations"] else None, description if item["Rule Violations"] else None)
+            for item, description in zip(items, product_description_images)
+        ]
+
+    # Without packing every row is a pack of its own
+    if pack_size > 1:
+        packs = pack_positions(pending_data, pack_size)
+    else:
+        packs = [[pos] for pos in range(len(pending_data))]
+
+    llm_start = time.perf_counter()
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pack_results = list(executor.map(run_pack, packs))
+    else:
+        pack_results = [run_pack(positions) for positions in packs]
+
+    generated = [None] * len(pending_data)
+    image_descriptions = [None] * len(pending_data)
+    for positions, items in zip(packs, pack_results):
+        for pos, (item, product_description_image) in zip(positions, items):
+            generated[pos] = item
+            image_descriptions[pos] = product_description_image
+
+    logger.info(f"Generated {len(generated)} taglines in {time.perf_counter() - llm_start:.3f}s")
+
+    # Regenerate only the rows that break a locally checked rule
+    violating = [pos for pos, item in enumerate(generated) if item is not None and item["Rule Violations"]]
+    if violating and MAX_REGENERATIONS > 0 and tagline_cache is not None and tagline_cache.cache_only:
+        # Regenerating sends new requests, which a cache-only run (batch collect,
+        # --from-cache) cannot make: the violations are only recorded
+        for pos in violating:
+            validation_stats.record_regeneration(0, generated[pos]["Rule Violations"])
+        logger.warning(f"Tagline cache is cache-only: {len(violating)} taglines breaking a rule were not regenerated")
+    elif violating and MAX_REGENERATIONS > 0:
+        def run_regeneration(pos):
+            attributes = pending_df.iloc[[pos]].to_dict(orient='records')[0]
+            item = generated[pos] = regenerate_item(
+                generated[pos], attributes, image_descriptions[pos], mega_matches[pos], analytics_matches[pos], brand,
+            )
+            if journal is not None:
+                with span("journal_write"):
+                    journal.append(brand, sheet_name, item["Item#"], item, version)
+            image_descriptions[pos] = None
+            if not return_rows:
+                generated[pos] = None
+
+        regeneration_start = time.perf_counter()
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(run_regeneration, violating))
         else:
-            item["Luxury Tagline"] = luxury_tagline
-        
-        output_data.append(item)
-    
+            for pos in violating:
+                run_regeneration(pos)
+        logger.info(f"Regenerated {len(violating)} taglines in {time.perf_counter() - regeneration_start:.3f}s")
+
+    validation = stats_since(validation_before, validation_stats.summary())
+    logger.info(f"Rule checks: {validation['violating']} of {validation['checked']} taglines violating "
+                f"({ratio(validation['violating'], validation['checked']):.0%}) {validation['rules']}, "
+                f"{validation['extra_calls']} extra calls, {validation['fixed']} fixed, {validation['unresolved']} unresolved")
+    pruning = stats_since(pruning_before, near_duplicate_stats.summary())
+    logger.info(f"Near-duplicate samples: {pruning['removed']} removed for {pruning['pruned_items']} of {pruning['items']} items, "
+                f"{pruning['tokens']} prompt tokens saved")
+    cache_stats = stats_since(cache_before, sample_cache.stats())
+    logger.info(f"Sample cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({ratio(cache_stats['hits'], cache_stats['hits'] + cache_stats['misses']):.0%} hit rate)")
+    usage = stats_since(usage_before, tagline_usage.summary())
+    logger.info(f"Tagline tokens: {usage['prompt_tokens']} prompt ({usage['cached_tokens']} cached, "
+                f"{ratio(usage['cached_tokens'], usage['prompt_tokens']):.0%}), {usage['completion_tokens']} completion "
+                f"over {usage['requests']} requests, {ratio(usage['seconds'], usage['requests']):.2f}s average latency")
+    if not return_rows:
+        return None
+
+    output_data = [None] * len(data)
+    for pos, item in zip(pending, generated):
+        output_data[pos] = item
+    if len(pending) < len(data):
+        journaled = journal.rows(brand, sheet_name)
+        for pos, item in enumerate(data):
+            if output_data[pos] is None:
+                output_data[pos] = journaled[str(item["Item#"])]
     return pd.DataFrame(output_data)
 
-def main():
-    # Define all use cases for Coach and Spade
-    coach_usecase1 = coach_sheets["1 New Romance Copy Generation"]
-    coach_usecase2 = coach_sheets["2 New Products Part of MegaPDP\u200b"]
-    coach_usecase3 = coach_sheets["3 Products for SEO Enrichment"]
-    
-    # spade_usecase1 = spade_sheets["1 New Romance Copy Generation"]
-    # spade_usecase2 = spade_sheets["2 New Products Part of MegaPDP\u200b"]
-    # spade_usecase3 = spade_sheets["3 Products for SEO Enrichment"]
-    
-    # List of use cases with their respective brands
-    usecases = [
-        (coach_usecase1, "Coach"),
-        (coach_usecase2, "Coach"),
-        (coach_usecase3, "Coach"),
-        # (spade_usecase1, "Spade"),
-        # (spade_usecase2, "Spade"),
-        # (spade_usecase3, "Spade"),
+def get_usecases():
+    """Return the (sheet DataFrame, brand, sheet name) use cases processed by main(), from each brand's "usecase_sheets"."""
+    return [
+        (brand.sheets[sheet_name], name, sheet_name)
+        for name, brand in brands.items()
+        for sheet_name in brand.usecase_sheets
     ]
-    
-    all_results = []
-    
-    # Process each use case and collect results
-    for usecase_df, brand in usecases:
-        processed_df = process_usecase(usecase_df, brand)
-        all_results.append(processed_df)
-    
-    # Concatenate all processed DataFrames
-    all_results_df = pd.concat(all_results, ignore_index=True)
-    
-    # Save first Excel file with all results in original format
-    all_results_df.to_excel("All_Usecases_Results.xlsx", index=False, engine='xlsxwriter', engine_kwargs={'options': {'strings_to_urls': False}})
-    print("Saved to All_Usecases_Results.xlsx")
-    
-    # Define columns for the new format Excel file
-    selected_columns = [
-        "Item#",
-        "Web Product Name - en",
-        "Mega PDP Group Value",
-        "editorial_tagline",
-        "SEO Keyword 1",
-        "SEO Keyword 2",
-        "SEO Keyword 3"
+
+def configure_logging():
+    """Log to stderr at TAGLINE_LOG_LEVEL (INFO by default), without the HTTP client's per-request lines."""
+    logging.basicConfig(level=os.getenv("TAGLINE_LOG_LEVEL", "INFO").upper(), format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+def export_run(journal, usecases):
+    """
+    Build both result workbooks from the journal, in sheet order, under
+    RESULTS_DIR, plus the per-brand workbooks under BRAND_RESULTS_DIR.
+    """
+    order = [
+        (brand, sheet_name, item_no)
+        for usecase_df, brand, sheet_name in usecases
+        for item_no in usecase_df["Item#"]
     ]
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    export_results(
+        journal,
+        os.path.join(RESULTS_DIR, "All_Usecases_Results.xlsx"),
+        os.path.join(RESULTS_DIR, "All_Results_New_Format.xlsx"),
+        order=order,
+    )
+
+    os.makedirs(BRAND_RESULTS_DIR, exist_ok=True)
+    for brand in dict.fromkeys(brand for _, brand, _ in usecases):
+        export_results(
+            journal,
+            os.path.join(BRAND_RESULTS_DIR, f"{brand}_All_Usecases_Results.xlsx"),
+            os.path.join(BRAND_RESULTS_DIR, f"{brand}_Result_Formatted.xlsx"),
+            order=[key for key in order if key[0] == brand],
+        )
+
+def main():
+    configure_logging()
+    with span("workbook_load"):
+        usecases = get_usecases()
+    brands.compile(brand for _, brand, _ in usecases)
     
-    # Create new DataFrame with selected columns
-    new_format_df = all_results_df[selected_columns]
+    # Every finished row is streamed to the journal as it completes, so an interrupted
+    # run resumes where it stopped and nothing accumulates in memory
+    journal = RunJournal(JOURNAL_PATH)
+    if len(journal):
+        logger.info(f"Loaded {len(journal)} finished rows from {JOURNAL_PATH}")
     
-    # Save second Excel file with new format
-    new_format_df.to_excel("All_Results_New_Format.xlsx", index=False, engine='xlsxwriter', engine_kwargs={'options': {'strings_to_urls': False}})
-    print("Saved to All_Results_New_Format.xlsx")
-
-if __name__ == "__main__":
-    main()
-
-main()
-
+    # Process each use case
+    for usecase_df, brand, sheet_name in usecases:
+        process_usecase(
+            usecase_df, brand, max_workers=MAX_WORKERS, sheet_name=sheet_name, journal=journal,
+            return_rows=False, pack_size=PACK_SIZE,
+        )
 
+    with span("excel_export"):
+        export_run(journal, usecases)
+
+    # Stage timings (TAGLINE_TIMING=1) under TAGLINE_TIMING_DIR
+    if pipeline_timing.timing.enabled:
+        pipeline_timing.write_reports()
+
+def profile_sample(sheet_name, brand="Coach", rows=50, from_cache=False, output_dir="profiles", top=10):
+    """
+    Profile process_usecase on the first `rows` rows of one sheet (see profiling).
+    LLM calls go to an in-process stub server with the response caches off, or
+    with from_cache are served only from the response caches (a miss raises CacheMiss).
+    """
+    global client, tagline_cache
+    import image_details_extractor
+    from profiling import print_stage_hotspots, profile_call
+
+    configure_logging()
+    if from_cache:
+        for cache in (tagline_cache, image_details_extractor.image_cache):
+            if cache is None:
+                raise SystemExit("--from-cache needs the response caches; unset TAGLINE_CACHE_DISABLED / IMAGE_CACHE_DISABLED")
+            cache.cache_only = True
+    else:
+        # Stub responses must not end up in the real response caches
+        from stub_openai_server import start_stub_server
+        server = start_stub_server()
+        client = OpenAI(api_key="stub", base_url=server.base_url)
+        image_details_extractor.client = client
+        tagline_cache = None
+        image_details_extractor.image_cache = None
+
+    usecase_df = brands[brand].sheets[sheet_name].head(rows)
+    name = f"{brand}_{''.join(char if char.isalnum() else '_' for char in sheet_name).strip('_')}_{len(usecase_df)}_rows"
+    stats, paths, seconds = profile_call(
+        lambda: process_usecase(usecase_df, brand, sheet_name=sheet_name, return_rows=False, pack_size=PACK_SIZE),
+        output_dir, name,
+    )
+    print(f"Profiled {len(usecase_df)} {brand} rows of {sheet_name!r} in {seconds:.2f}s")
+    print(f"cProfile: {paths['cprofile']}  flame graph (folded stacks): {paths['flamegraph']}")
+    print_stage_hotspots(stats, top)
 
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate taglines for the use-case sheets.")
+    parser.add_argument("--profile", action="store_true", help="profile a sample of rows instead of running every sheet")
+    parser.add_argument("--sheet", default="1 New Romance Copy Generation", help="sheet to profile")
+    parser.add_argument("--brand", default="Coach", choices=list(brands), help="brand of the profiled sheet")
+    parser.add_argument("--rows", type=int, default=50, help="rows of the sheet to profile")
+    parser.add_argument("--from-cache", action="store_true", help="serve LLM calls from the response caches instead of a local stub")
+    parser.add_argument("--profile-dir", default="profiles", help="directory for the .prof and .folded artifacts")
+    parser.add_argument("--top", type=int, default=10, help="hot functions listed per stage")
+    args = parser.parse_args()
+
+    if args.profile:
+        profile_sample(args.sheet, args.brand, args.rows, args.from_cache, args.profile_dir, args.top)
+    else:
+        main()
@@ -0,0 +1,213 @@
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+# pyarrow is the parquet engine; without it workbooks are read directly
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+SNAPSHOT_DIR = os.getenv("WORKBOOK_SNAPSHOT_DIR", "cache/snapshots")
+
+# Convert string columns to categoricals when at most this share of values is distinct
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_stem(path, snapshot_dir):
+    name = os.path.splitext(os.path.basename(path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(snapshot_dir, f"{name}-{path_hash}")
+
+
+def is_current(manifest, path):
+    """
+    True when a snapshot manifest still describes the source file: same mtime and
+    size, or (after a touch or copy) the same content hash. A matching hash
+    refreshes the stored mtime so the next check is cheap again.
+    """
+    if manifest is None:
+        return False
+    stat = os.stat(path)
+    if manifest["mtime_ns"] == stat.st_mtime_ns and manifest["size"] == stat.st_size:
+        return True
+    if manifest["size"] == stat.st_size and manifest["sha256"] == file_sha256(path):
+        manifest["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def read_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(manifest_path, manifest):
+    # Per-writer temporary file, so concurrent writers never share one
+    tmp_path = f"{manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def manifest_is_current(manifest_path, manifest, path):
+    """
+    is_current() for a manifest read from manifest_path; the manifest is written
+    back only when the content-hash check refreshed its stored mtime.
+    """
+    if manifest is None:
+        return False
+    mtime_ns = manifest["mtime_ns"]
+    if not is_current(manifest, path):
+        return False
+    if manifest["mtime_ns"] != mtime_ns:
+        write_manifest(manifest_path, manifest)
+    return True
+
+
+def source_manifest(path):
+    stat = os.stat(path)
+    return {"source": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_sha256(path)}
+
+
+class WorkbookSnapshot(Mapping):
+    """
+    Read-only mapping of sheet name -> DataFrame, like pd.read_excel(path, sheet_name=None),
+    backed by a per-sheet Parquet snapshot of the workbook.
+
+    The snapshot is rebuilt only when the workbook changes (checked by mtime, then
+    content hash). Sheets listed in `columns` are lookup tables: they are
+    projected to those columns and their mostly-repeated string columns are
+    stored as categoricals. Other sheets keep every column and dtype. Each sheet
+    is only read from disk the first time it is accessed. Without pyarrow the
+    workbook is read directly with pd.read_excel.
+    """
+
+    def __init__(self, path, columns=None, snapshot_dir=SNAPSHOT_DIR):
+        self.path = path
+        self.columns = columns or {}
+        self.snapshot_dir = snapshot_dir
+        self._sheets = {}
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        if self._manifest is not None:
+            return self._manifest
+
+        if not HAS_PARQUET:
+            sheets = pd.read_excel(self.path, sheet_name=None)
+            self._sheets = {name: self._project(name, df) for name, df in sheets.items()}
+            self._manifest = {"sha256": file_sha256(self.path), "sheets": {name: None for name in sheets}}
+            return self._manifest
+
+        stem = snapshot_stem(self.path, self.snapshot_dir)
+        manifest_path = stem + ".json"
+        manifest = read_manifest(manifest_path)
+        if manifest is not None and manifest.get("columns") != self.columns:
+            manifest = None
+        if not manifest_is_current(manifest_path, manifest, self.path):
+            manifest = self._build(stem)
+            write_manifest(manifest_path, manifest)
+        self._manifest = manifest
+        return manifest
+
+    def _project(self, sheet_name, df):
+        wanted = self.columns.get(sheet_name)
+        if wanted is None:
+            return df
+        return df[[column for column in wanted if column in df.columns]]
+
+    def _build(self, stem):
+        """Convert every sheet of the workbook to Parquet and return the new manifest."""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        manifest = source_manifest(self.path)
+        manifest["columns"] = self.columns
+        manifest["sheets"] = {}
+
+        for position, (sheet_name, df) in enumerate(pd.read_excel(self.path, sheet_name=None).items()):
+            projected = sheet_name in self.columns
+            df = self._project(sheet_name, df).copy()
+            json_columns = []
+            for column in df.columns:
+                if df[column].dtype != object and not pd.api.types.is_string_dtype(df[column]):
+                    continue
+                if len({type(value) for value in df[column].dropna()}) > 1:
+                    # Mixed types (e.g. numeric and text Item#): keep each cell's Python type via JSON
+                    df[column] = [None if pd.isna(value) else json.dumps(value) for value in df[column]]
+                    json_columns.append(column)
+                elif projected and len(df) and df[column].nunique() <= CATEGORICAL_MAX_UNIQUE_RATIO * len(df):
+                    df[column] = df[column].astype("category")
+
+            sheet_path = f"{stem}.{position}.parquet"
+            df.to_parquet(sheet_path, index=False)
+            manifest["sheets"][sheet_name] = {"file": sheet_path, "json_columns": json_columns}
+            self._sheets[sheet_name] = df if not json_columns else None
+
+        # Sheets that needed JSON encoding are decoded on first access
+        self._sheets = {name: df for name, df in self._sheets.items() if df is not None}
+        return manifest
+
+    def __getitem__(self, sheet_name):
+        with self._lock:
+            if sheet_name in self._sheets:
+                return self._sheets[sheet_name]
+            entry = self._load_manifest()["sheets"][sheet_name]
+            if sheet_name not in self._sheets:
+                df = pd.read_parquet(entry["file"])
+                for column in entry["json_columns"]:
+                    df[column] = [json.loads(value) if isinstance(value, str) else np.nan for value in df[column]]
+                self._sheets[sheet_name] = df
+            return self._sheets[sheet_name]
+
+    @property
+    def sha256(self):
+        """Content hash of the workbook the sheets are read from."""
+        with self._lock:
+            return self._load_manifest()["sha256"]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._load_manifest()["sheets"]))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load_manifest()["sheets"])
+
+
+def load_docx_text(path, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Return the paragraphs of a .docx file joined with newlines, cached as a text
+    snapshot that is rebuilt only when the document changes.
+    """
+    stem = snapshot_stem(path, snapshot_dir)
+    manifest_path = stem + ".json"
+    text_path = stem + ".txt"
+
+    manifest = read_manifest(manifest_path)
+    if os.path.exists(text_path) and manifest_is_current(manifest_path, manifest, path):
+        with open(text_path, encoding="utf-8") as text_file:
+            return text_file.read()
+
+    from docx import Document
+
+    text = "\n".join([para.text for para in Document(path).paragraphs])
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(text_path, "w", encoding="utf-8", newline="") as text_file:
+        text_file.write(text)
+    write_manifest(manifest_path, source_manifest(path))
+    return text